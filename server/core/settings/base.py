@@ -143,3 +143,6 @@ LOBBY_EXPIRE_SECONDS = 10
 # REDIS
 
 REDIS_OM_URL = os.environ["REDIS_OM_URL"]
+
+# Maximum amount of connections a process keeps open to redis
+REDIS_MAX_CONNECTIONS = 64
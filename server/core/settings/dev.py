@@ -26,7 +26,7 @@ REDIS_CHANNEL_LAYER_URL = os.environ["REDIS_CHANNEL_LAYER_URL"]
 
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "BACKEND": "core.layers.OrmsgpackRedisChannelLayer",
         "CONFIG": {"hosts": [REDIS_CHANNEL_LAYER_URL]},
     }
 }
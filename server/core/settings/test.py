@@ -19,3 +19,12 @@ CHANNEL_LAYERS = {
         "BACKEND": "channels.layers.InMemoryChannelLayer",
     }
 }
+
+# PASSWORDS
+
+# Passwords of users created in tests are hashed with a fast hasher,
+# the fixture users keep their PBKDF2 hashes.
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+]
@@ -0,0 +1,47 @@
+from channels_redis.core import RedisChannelLayer
+from core.layers import OrmsgpackRedisChannelLayer
+from django.test import SimpleTestCase
+from trivia.types import GameEndEvent, GameStatus, LobbyEventsEvent
+
+
+class OrmsgpackRedisChannelLayerTestCase(SimpleTestCase):
+    def setUp(self):
+        self.channel_layer = OrmsgpackRedisChannelLayer()
+
+        game_end: GameEndEvent = {
+            "type": "game.end",
+            "users": {
+                "1": {"status": GameStatus.WIN, "rank_gain": 20},
+                "2": {"status": GameStatus.LOSS, "rank_gain": -20},
+            },
+        }
+        self.message: LobbyEventsEvent = {
+            "type": "lobby.events",
+            "events": [{"type": "question.next"}, game_end],
+        }
+
+    def test_serialize_deserialize(self):
+        deserialized = self.channel_layer.deserialize(self.channel_layer.serialize(self.message))
+
+        self.assertEqual(deserialized, self.message)
+        self.assertEqual(deserialized["events"][1]["users"]["1"]["status"], GameStatus.WIN)
+
+    def test_serialize_deserialize_encrypted(self):
+        channel_layer = OrmsgpackRedisChannelLayer(symmetric_encryption_keys=["TEST_ENCRYPTION_KEY"])
+
+        self.assertEqual(channel_layer.deserialize(channel_layer.serialize(self.message)), self.message)
+
+    def test_serialize_adds_random_prefix(self):
+        first, second = self.channel_layer.serialize(self.message), self.channel_layer.serialize(self.message)
+
+        self.assertNotEqual(first[:12], second[:12])
+        self.assertEqual(first[12:], second[12:])
+
+    def test_messages_are_compatible_with_redis_channel_layer(self):
+        redis_channel_layer = RedisChannelLayer()
+
+        self.assertEqual(self.channel_layer.deserialize(redis_channel_layer.serialize(self.message)), self.message)
+        self.assertEqual(redis_channel_layer.deserialize(self.channel_layer.serialize(self.message)), self.message)
+        self.assertEqual(
+            self.channel_layer.serialize(self.message)[12:], redis_channel_layer.serialize(self.message)[12:]
+        )
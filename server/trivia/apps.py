@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from redis_om import Migrator
 
 
 class TriviaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "trivia"
+
+    def ready(self):
+        # Before we can run queries, we need to run migrations to set up the
+        # indexes that Redis OM will use.
+        Migrator().run()
@@ -1,20 +1,24 @@
 import html
+import logging
 import random
-from datetime import datetime, timedelta
-from itertools import chain
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Optional
 
-from asgiref.sync import async_to_sync
-from channels.exceptions import AcceptConnection, DenyConnection
-from channels.generic.websocket import JsonWebsocketConsumer
+import orjson
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.exceptions import DenyConnection
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from jwt.exceptions import InvalidTokenError
-from redis_om.model.model import NotFoundError
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.db.models.functions import Greatest
+from pydantic import ValidationError, parse_obj_as
 
 from .models import Game, Lobby, LobbyState
 from .types import (
-    HP,
     ClientEvent,
     CorrectAnswer,
     FiftyRequestedEvent,
@@ -24,20 +28,65 @@ from .types import (
     GameStartEvent,
     GameStatus,
     GameType,
+    LobbyEventsEvent,
+    OpponentAnsweredEvent,
+    PlayerData,
     QuestionAnsweredEvent,
     QuestionDataEvent,
     QuestionNextEvent,
+    QuestionResultEvent,
+    ServerEvent,
     TriviaAPIQuestion,
-    UserAnsweredEvent,
     UserId,
     UserStatus,
 )
-from .utils import TriviaAPIClient, decode_lobby_token
+from .utils import (
+    InvalidLobbyTokenError,
+    TriviaAPIClient,
+    TriviaAPIError,
+    decode_lobby_token,
+    get_current_time_ms,
+)
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Settings used on every answered question are looked up once, instead of going through django's lazy settings
+# Damage and maximum duration (in milliseconds) of questions, keyed by difficulty
+QUESTION_DIFFICULTY_RULES_MAP = MappingProxyType(
+    {
+        difficulty: (damage, settings.QUESTION_MAX_DURATION_SECONDS_MAP[difficulty] * 1000)
+        for difficulty, damage in settings.QUESTION_DIFFICULTY_DAMAGE_MAP.items()
+    }
+)
+GAME_MAX_DURATION_MS = settings.GAME_MAX_DURATION_SECONDS * 1000
+GAME_STATUS_RANK_GAIN_MAP = MappingProxyType(
+    {
+        GameStatus.WIN: settings.GAME_RANK_GAIN,
+        GameStatus.LOSS: -settings.GAME_RANK_GAIN,
+        GameStatus.DRAW: 0,
+    }
+)
+
+# Messages that are the same for every user are encoded once, instead of on every send
+GAME_PREPARE_MESSAGE = orjson.dumps({"type": "game.prepare"}).decode()
+QUESTION_NEXT_MESSAGE = orjson.dumps({"type": "question.next"}).decode()
 
+# Sets of questions are prefetched in the background, so users don't wait for the Trivia API between sets
+question_prefetch_executor = ThreadPoolExecutor(thread_name_prefix="question_prefetch")
+# The Trivia API allows a single request per IP every 5 seconds, the next set of questions is prefetched
+# halfway through the current one, instead of right after the request that obtained it
+QUESTION_PREFETCH_COUNT = settings.TRIVIA_API_QUESTION_AMOUNT // 2
 
-class GameConsumer(JsonWebsocketConsumer):
+
+def log_prefetch_error(future: Future) -> None:
+    """Logs the exception a question prefetch failed with, the lobby falls back to fetching the questions directly"""
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Failed to prefetch the next set of questions", exc_info=exception)
+
+
+class GameConsumer(AsyncJsonWebsocketConsumer):
     """
     Consumer that is used to play a multiplayer trivia game.
 
@@ -59,6 +108,13 @@ class GameConsumer(JsonWebsocketConsumer):
         - opponent.answered => tell a user how their opponent answered a question
     """
 
+    # Maps client event types to the names of their handlers and the format the events are expected to have
+    client_event_handlers: dict[str, tuple[str, type[ClientEvent]]] = {
+        "game.ready": ("receive_game_ready", ClientEvent),
+        "question.answered": ("receive_question_answered", QuestionAnsweredEvent),
+        "fifty.request": ("receive_fifty_request", FiftyRequestedEvent),
+    }
+
     def __init__(self, *args, **kwargs):
         self.lobby_name: Optional[str] = None
         self.user_id: Optional[int] = None
@@ -68,6 +124,14 @@ class GameConsumer(JsonWebsocketConsumer):
 
         super().__init__(*args, **kwargs)
 
+    @classmethod
+    async def decode_json(cls, text_data: str) -> dict:
+        return orjson.loads(text_data)
+
+    @classmethod
+    async def encode_json(cls, content: dict) -> str:
+        return orjson.dumps(content).decode()
+
     def get_token_from_query_string(self) -> str:
         """
         Extracts the lobby authentication token from the query string.
@@ -76,11 +140,11 @@ class GameConsumer(JsonWebsocketConsumer):
         so for example /my_lobby?the_authentication_token
 
         Returns:
-            base64 encoded JWT
+            signed lobby token
         """
         return self.scope["query_string"].decode()
 
-    def connect(self):
+    async def connect(self):
         """
         Validate that the user is authenticated and try to connect them to a lobby.
 
@@ -90,47 +154,39 @@ class GameConsumer(JsonWebsocketConsumer):
         """
         self.lobby_name = self.scope["url_route"]["kwargs"]["lobby_name"]
 
-        try:
-            lobby = Lobby.get(self.lobby_name)
-        except NotFoundError:
-            raise DenyConnection()
-
-        if len(lobby.users) > 1:
-            raise DenyConnection()
-
         token = self.get_token_from_query_string()
         try:
             token_data = decode_lobby_token(token)
-        except InvalidTokenError:
+        except InvalidLobbyTokenError:
             raise DenyConnection()
 
         if token_data["lobby_name"] != self.lobby_name:
             raise DenyConnection()
 
-        if lobby.users.get(token_data["id"]):
+        # The user is only added if the lobby exists, is not full and the user is not already in it.
+        # Lobbies are created with an expiration time, after the first user
+        # connects, the expiration time is removed.
+        user_count, opponent_channel_name = await sync_to_async(Lobby.add_user, thread_sensitive=False)(
+            self.lobby_name, token_data["id"], {"name": token_data["username"], "hp": 100}, self.channel_name
+        )
+        if not user_count:
             raise DenyConnection()
 
-        lobby.users[token_data["id"]] = {"name": token_data["username"], "hp": 100}
-
         self.user_id = token_data["id"]
 
-        async_to_sync(self.channel_layer.group_add)(self.lobby_name, self.channel_name)
+        await self.channel_layer.group_add(self.lobby_name, self.channel_name)
 
-        if len(lobby.users) == 1:
-            # Lobbies are created with an expiration time, after the first user
-            # connects, the expiration time should be removed.
-            Lobby.db().persist(lobby.key())
-        elif len(lobby.users) == 2:
+        await self.accept()
+
+        if user_count == 2:
             # Whenever the second user successfully connects to a lobby, the game is ready to be started.
             # An event is sent to the users to notify them that the game is ready to be started.
             # Server awaits user responses to start the game.
-            self.send_event_to_lobby("game.prepare")
-
-        lobby.save()
+            # The connecting user is notified directly, their opponent through the opponent's own channel.
+            await self.send(text_data=GAME_PREPARE_MESSAGE)
+            await self.channel_layer.send(opponent_channel_name, {"type": "game.prepare"})
 
-        raise AcceptConnection()
-
-    def disconnect(self, code):
+    async def disconnect(self, code):
         """
         Removes a connected user from the lobby.
 
@@ -142,50 +198,37 @@ class GameConsumer(JsonWebsocketConsumer):
         if not self.user_id:
             return
 
-        lobby = Lobby.get(self.lobby_name)
-
-        # If both users have disconnected, the lobby is deleted.
-        if len(lobby.users) == 1:
-            Lobby.delete(lobby.name)
-            async_to_sync(self.channel_layer.group_discard)(self.lobby_name, self.channel_name)
-            return
-
-        async_to_sync(self.channel_layer.group_discard)(self.lobby_name, self.channel_name)
+        game_end = await sync_to_async(Lobby.disconnect_user, thread_sensitive=False)(self.lobby_name, self.user_id)
+        await self.channel_layer.group_discard(self.lobby_name, self.channel_name)
 
-        if lobby.state == LobbyState.IN_PROGRESS:
+        if game_end:
             # If one of the users disconnected, but the game was still in progress declare the in game user a winner
-            opponent_user_id = next(user_id for user_id in lobby.users.keys() if user_id != self.user_id)
-            self.handle_game_end(
+            opponent_user_id, ranked = game_end
+            await self.handle_game_end(
                 {
                     self.user_id: GameStatus.LOSS,
                     opponent_user_id: GameStatus.WIN,
-                }
+                },
+                ranked,
             )
 
-        del lobby.users[self.user_id]
-        lobby.save()
-
-    def receive_json(self, event: ClientEvent, **kwargs):
+    async def receive_json(self, event: ClientEvent, **kwargs):
         """
         Try to call a handler associated with the received event type.
+
+        Events of unknown types and events that do not match the format
+        expected by their handler are ignored.
         """
 
-        if not (event_type := event.get("type")):
+        try:
+            handler_name, event_format = self.client_event_handlers[event["type"]]
+            event = parse_obj_as(event_format, event)
+        except (KeyError, TypeError, ValidationError):
             return
 
-        match event_type:
-            case "game.ready":
-                self.receive_game_ready(event)
-            case "question.answered":
-                event: QuestionAnsweredEvent
-                self.receive_question_answered(event)
-            case "fifty.request":
-                event: FiftyRequestedEvent
-                self.receive_fifty_request(event)
-            case _:
-                return
+        await getattr(self, handler_name)(event)
 
-    def receive_game_ready(self, _event: dict):
+    async def receive_game_ready(self, _event: dict):
         """
         Client event that notifies the server when a user is ready to start the game.
 
@@ -197,44 +240,57 @@ class GameConsumer(JsonWebsocketConsumer):
             - send them the initial questions
             - notify them to start answering the first question
         """
-        lobby = Lobby.get(self.lobby_name)
-        if len(lobby.users) != 2 or lobby.ready_count >= 2 or self.ready_sent:
+        if self.ready_sent:
+            return
+
+        ready_count = await sync_to_async(Lobby.mark_ready, thread_sensitive=False)(self.lobby_name)
+        if not ready_count:
             return
 
-        lobby.ready_count += 1
         self.ready_sent = True
 
-        if lobby.ready_count == 1:
-            lobby.save()
+        if ready_count == 1:
             return
 
-        lobby.trivia_token = TriviaAPIClient.get_token()
+        lobby = await sync_to_async(Lobby.get, thread_sensitive=False)(self.lobby_name)
+        lobby.trivia_token = await sync_to_async(TriviaAPIClient.get_token, thread_sensitive=False)()
         lobby.state = LobbyState.IN_PROGRESS
-        lobby.game_start_time = datetime.now()
-        self.send_event_to_lobby(
-            "game.start",
+        lobby.game_start_time = get_current_time_ms()
+        try:
+            formatted_questions, correct_answers = await sync_to_async(
+                self.get_and_format_questions, thread_sensitive=False
+            )(lobby.trivia_token)
+        except TriviaAPIError:
+            # the game can not be played without questions, users still have full hp so it ends in a draw
+            await self.end_game(lobby)
+            return
+
+        lobby.correct_answers = correct_answers
+        lobby.question_start_time = get_current_time_ms()
+
+        # the game is only started with both users in the lobby
+        (user1_id, user1), (user2_id, user2) = lobby.users.items()
+        await self.send_events_to_lobby(
             {
-                "users": {
-                    str(user_id): lobby.users[opponent_id]["name"]
-                    for user_id, opponent_id in zip(lobby.users.keys(), reversed(lobby.users.keys()))
-                },
+                "type": "game.start",
+                "users": {str(user1_id): user2["name"], str(user2_id): user1["name"]},
                 "duration": settings.GAME_MAX_DURATION_SECONDS,
             },
+            self.make_question_data_event(formatted_questions),
+            {"type": "question.next"},
         )
-        formatted_questions, correct_answers = self.get_and_format_questions(lobby.trivia_token)
-        lobby.correct_answers = correct_answers
-        self.send_event_to_lobby("question.data", {"questions": formatted_questions})
-        lobby.question_start_time = datetime.now()
-        self.send_event_to_lobby("question.next")
 
-        lobby.save()
+        await sync_to_async(lobby.save_fields, thread_sensitive=False)(
+            "trivia_token", "state", "game_start_time", "correct_answers", "question_start_time"
+        )
 
-    def receive_question_answered(self, event: QuestionAnsweredEvent):
+    async def receive_question_answered(self, event: QuestionAnsweredEvent):
         """
         Client event that notifies the server that a user has answered a question.
 
         Whenever a user answers a question, an event is sent back in response to both users,
-        to notify them how the question was answered.
+        to notify them how the question was answered. The user that answered the question is
+        notified directly, and their opponent through the opponent's own channel.
 
         When both users answer the question, the current question count is checked to
         determine if users have answered all the currently available questions. If so,
@@ -250,7 +306,7 @@ class GameConsumer(JsonWebsocketConsumer):
 
         If the game has not ended the users are notified to continue to the next question.
         """
-        lobby = Lobby.get(self.lobby_name)
+        lobby = await sync_to_async(Lobby.get, thread_sensitive=False)(self.lobby_name)
 
         if self.question_answered:
             return
@@ -259,61 +315,82 @@ class GameConsumer(JsonWebsocketConsumer):
 
         correct_answer = lobby.correct_answers[lobby.current_question_count]
 
-        question_max_duration = timedelta(seconds=settings.QUESTION_MAX_DURATION_SECONDS_MAP[correct_answer.difficulty])
+        question_damage, question_max_duration = QUESTION_DIFFICULTY_RULES_MAP[correct_answer.difficulty]
         if (
             event["answer"] != correct_answer.answer
-            or datetime.now() > lobby.question_start_time + question_max_duration
+            or get_current_time_ms() > lobby.question_start_time + question_max_duration
         ):
             correctly = False
-            damage = settings.QUESTION_DIFFICULTY_DAMAGE_MAP[correct_answer.difficulty]
-            lobby.users[self.user_id]["hp"] -= damage
+            damage = question_damage
         else:
             damage = 0
             correctly = True
 
-        self.send_event_to_lobby(
-            "user.answered",
-            {
-                "user_id": self.user_id,
+        answer_count, lobby.users = await sync_to_async(Lobby.record_answer, thread_sensitive=False)(
+            self.lobby_name, self.user_id, damage
+        )
+
+        question_result: QuestionResultEvent = {
+            "type": "question.result",
+            "correctly": correctly,
+            "correct_answer": correct_answer.answer,
+            "damage": damage,
+        }
+        await self.send_json(question_result)
+
+        opponent_channel_name = self.get_opponent_channel_name(lobby)
+        if opponent_channel_name:
+            opponent_answered: OpponentAnsweredEvent = {
+                "type": "opponent.answered",
                 "correctly": correctly,
-                "correct_answer": correct_answer.answer,
                 "damage": damage,
-            },
-        )
+            }
+            await self.channel_layer.send(opponent_channel_name, opponent_answered)
 
         # question has been answered for the first time
-        if lobby.current_answer_count == 0:
-            lobby.current_answer_count += 1
-            lobby.save()
+        if answer_count == 1:
             return
 
         # otherwise, both users have answered the question
 
-        if any(
-            user for user in lobby.users.values() if user["hp"] <= 0
-        ) or datetime.now() > lobby.game_start_time + timedelta(seconds=settings.GAME_MAX_DURATION_SECONDS):
-            self.handle_game_end(
-                self.determine_user_status_by_hp(list((user_id, data["hp"]) for user_id, data in lobby.users.items()))
-            )
+        if (
+            min(user["hp"] for user in lobby.users.values()) <= 0
+            or get_current_time_ms() > lobby.game_start_time + GAME_MAX_DURATION_MS
+        ):
+            await self.end_game(lobby)
             return
 
+        events: list[ServerEvent] = []
+        updated_fields = ["current_question_count", "current_answer_count", "question_start_time"]
+
         # current set of questions has been exhausted, obtain new ones
         if lobby.current_question_count == settings.TRIVIA_API_QUESTION_AMOUNT - 1:
             lobby.current_question_count = 0
 
-            formatted_questions, correct_answer = self.get_and_format_questions(lobby.trivia_token)
-            lobby.correct_answers = correct_answer
-            self.send_event_to_lobby("question.data", {"questions": formatted_questions})
+            try:
+                question_data_event, lobby.correct_answers = await sync_to_async(
+                    self.get_next_questions, thread_sensitive=False
+                )(lobby.trivia_token)
+            except TriviaAPIError:
+                # the game can not continue without questions, it ends with the users' current hp
+                await self.end_game(lobby)
+                return
+
+            events.append(question_data_event)
+            updated_fields.append("correct_answers")
         else:
             lobby.current_question_count += 1
 
+            if lobby.current_question_count == QUESTION_PREFETCH_COUNT:
+                self.prefetch_questions(lobby.trivia_token)
+
         lobby.current_answer_count = 0
-        lobby.question_start_time = datetime.now()
-        lobby.save()
+        lobby.question_start_time = get_current_time_ms()
+        await sync_to_async(lobby.save_fields, thread_sensitive=False)(*updated_fields)
 
-        self.send_event_to_lobby("question.next")
+        await self.send_events_to_lobby(*events, {"type": "question.next"})
 
-    def receive_fifty_request(self, event: FiftyRequestedEvent):
+    async def receive_fifty_request(self, event: FiftyRequestedEvent):
         """
         Client event that notifies the server that a user wants to use their 50/50 chance.
 
@@ -330,114 +407,173 @@ class GameConsumer(JsonWebsocketConsumer):
 
         self.fifty_used = True
 
-        lobby = Lobby.get(self.lobby_name)
-        correct_answer = lobby.correct_answers[lobby.current_question_count].answer
-        if correct_answer in ("True", "False") or len(event["answers"]) != 4:
+        if len(event["answers"]) != 4:
             return
 
-        incorrect_answers = tuple(answer for answer in event["answers"] if answer != correct_answer)
+        correct_answer = await sync_to_async(Lobby.get_current_correct_answer, thread_sensitive=False)(self.lobby_name)
+        if correct_answer is None or correct_answer.answer in ("True", "False"):
+            return
+
+        incorrect_answers = tuple(answer for answer in event["answers"] if answer != correct_answer.answer)
         if len(incorrect_answers) != 3:
             return
 
         random_incorrect_answers = random.sample(incorrect_answers, k=2)
-        self.send_json({"type": "fifty.response", "incorrect_answers": random_incorrect_answers})
+        await self.send_json({"type": "fifty.response", "incorrect_answers": random_incorrect_answers})
 
-    def send_event_to_lobby(self, msg_type: str, data: dict = None) -> None:
+    def get_opponent_channel_name(self, lobby: Lobby) -> Optional[str]:
+        """
+        Returns the name of the channel that the consumer of the user's opponent is listening on,
+        or None if the opponent is not connected.
+        """
+        opponent_user_ids = lobby.channel_names.keys() - {self.user_id}
+        return lobby.channel_names[opponent_user_ids.pop()] if opponent_user_ids else None
+
+    async def send_event_to_lobby(self, msg_type: str, data: dict = None) -> None:
         """Wrapper function to broadcast messages to the lobby's channel group"""
 
         if data is None:
             data = {}
 
-        async_to_sync(self.channel_layer.group_send)(self.lobby_name, {"type": msg_type, **data})
+        await self.channel_layer.group_send(self.lobby_name, {"type": msg_type, **data})
+
+    async def send_events_to_lobby(self, *events: ServerEvent) -> None:
+        """
+        Broadcast several events to the lobby's channel group.
+
+        The events are sent with a single channel layer message, which the consumers
+        of the lobby handle one event after another, since clients expect to receive them in order.
+        """
+        lobby_events: LobbyEventsEvent = {"type": "lobby.events", "events": list(events)}
+        await self.channel_layer.group_send(self.lobby_name, lobby_events)
+
+    def make_question_data_event(self, questions: list[FormattedQuestion]) -> QuestionDataEvent:  # noqa
+        """
+        Creates a question.data event for the given questions.
 
-    def handle_game_end(self, users: dict[UserId, GameStatus]) -> None:
+        The message that the users receive is encoded here once, so consumers of the
+        lobby can send it as is, without encoding the same questions again.
         """
-        Stores a record of the game and associated information in the database,
-        updates user ranks if the game was ranked and send an event to the users to notify them
-        about the results of the game.
+        return {
+            "type": "question.data",
+            "text_data": orjson.dumps({"type": "question.data", "questions": questions}).decode(),
+        }
+
+    async def end_game(self, lobby: Lobby) -> None:
+        """
+        Marks the lobby as finished and ends the game, the users' statuses are determined by their hp.
+
+        Args:
+            lobby: the lobby the game is played in
         """
-        lobby = Lobby.get(self.lobby_name)
         lobby.state = LobbyState.FINISHED
-        lobby.save()
-
-        user_status_dict: dict[str, UserStatus] = {}
-        user1, user2 = User.objects.filter(pk__in=(users.keys()))
-        user1_status, user2_status = users[user1.pk], users[user2.pk]
-
-        for user, status in (user1, user1_status), (user2, user2_status):
-            rank_gain = self.determine_rank_gain_by_game_status(status)
-            if lobby.ranked:
-                user.rank = max(user.rank + rank_gain, 0)
-                user.save()
-
-            user_status_dict[str(user.pk)] = {"status": status, "rank_gain": rank_gain}
-
-        Game.objects.save_multiplayer_game(
-            game_type=GameType.RANKED if lobby.ranked else GameType.NORMAL,
-            user1=user1,
-            user2=user2,
-            user1_status=user1_status,
-            user2_status=user2_status,
-        )
+        await sync_to_async(lobby.save_fields, thread_sensitive=False)("state")
+        await self.handle_game_end(self.determine_user_status_by_hp(lobby.users), bool(lobby.ranked))
+
+    async def handle_game_end(self, users: dict[UserId, GameStatus], ranked: bool) -> None:
+        """
+        Sends an event to the users to notify them about the results of the game,
+        stores a record of the game and associated information in the database and
+        updates user ranks if the game was ranked.
+
+        The users are notified before the results are stored, so that storing the
+        game does not delay the end of the game for them. Callers are expected to
+        have marked the lobby as finished.
+
+        Args:
+            users: the game statuses of the users, keyed by their ids
+            ranked: whether the game was ranked
+        """
+
+        rank_gains = {user_id: self.determine_rank_gain_by_game_status(status) for user_id, status in users.items()}
+        user_status_dict: dict[str, UserStatus] = {
+            str(user_id): {"status": status, "rank_gain": rank_gains[user_id]} for user_id, status in users.items()
+        }
 
-        self.send_event_to_lobby("game.end", {"users": user_status_dict})
+        await self.send_event_to_lobby("game.end", {"users": user_status_dict})
 
-    def game_prepare(self, event: GamePrepareEvent):
-        self.send_json(event)
+        await database_sync_to_async(self.save_game_result)(ranked, users, rank_gains)
 
-    def game_start(self, event: GameStartEvent):
+    def save_game_result(  # noqa
+        self, ranked: bool, users: dict[UserId, GameStatus], rank_gains: dict[UserId, int]
+    ) -> None:
+        """
+        Stores a record of a finished game in the database and updates user ranks if the game was ranked.
+
+        Args:
+            ranked: whether the game was ranked
+            users: the game statuses of the users, keyed by their ids
+            rank_gains: the rank gains of the users, keyed by their ids
+        """
+        # only the ranks of the users are needed, the order of the users does not matter,
+        # since their statuses are looked up by their ids
+        user1, user2 = User.objects.filter(pk__in=users.keys()).only("rank")
+
+        if ranked:
+            for user in user1, user2:
+                user.rank = max(user.rank + rank_gains[user.pk], 0)
+
+        with transaction.atomic():
+            if ranked:
+                # ranks of both users are updated with a single query
+                User.objects.filter(pk__in=rank_gains.keys()).update(
+                    rank=Greatest(
+                        Case(*(When(pk=pk, then=F("rank") + rank_gain) for pk, rank_gain in rank_gains.items())),
+                        0,
+                    )
+                )
+
+            Game.objects.save_multiplayer_game(
+                game_type=GameType.RANKED if ranked else GameType.NORMAL,
+                user1=user1,
+                user2=user2,
+                user1_status=users[user1.pk],
+                user2_status=users[user2.pk],
+            )
+
+    async def game_prepare(self, event: GamePrepareEvent):
+        await self.send(text_data=GAME_PREPARE_MESSAGE)
+
+    async def game_start(self, event: GameStartEvent):
         opponent = event["users"][str(self.user_id)]
 
-        self.send_json({"type": event["type"], "duration": event["duration"], "opponent": opponent})
+        await self.send_json({"type": event["type"], "duration": event["duration"], "opponent": opponent})
 
-    def game_end(self, event: GameEndEvent):
+    async def game_end(self, event: GameEndEvent):
         user_status = event["users"][str(self.user_id)]
         status = GameStatus(user_status["status"]).name.lower()
 
-        self.send_json({"type": event["type"], "status": status, "rank_gain": user_status["rank_gain"]})
+        await self.send_json({"type": event["type"], "status": status, "rank_gain": user_status["rank_gain"]})
 
-        self.close()
+        await self.close()
 
-    def question_data(self, event: QuestionDataEvent):
-        self.send_json(event)
+    async def question_data(self, event: QuestionDataEvent):
+        await self.send(text_data=event["text_data"])
 
-    def question_next(self, event: QuestionNextEvent):
+    async def question_next(self, event: QuestionNextEvent):
         self.question_answered = False
-        self.send_json(event)
+        await self.send(text_data=QUESTION_NEXT_MESSAGE)
 
-    def user_answered(self, event: UserAnsweredEvent):
-        """
-        user.answered event is split and sent as two different events:
-            - question.result: is sent to the user that answered the question
-            - opponent.answered: is sent to that users opponent (the other user)
-        """
-        message = {
-            "correctly": event["correctly"],
-            "correct_answer": event["correct_answer"],
-            "damage": event["damage"],
-        }
+    async def opponent_answered(self, event: OpponentAnsweredEvent):
+        await self.send_json(event)
 
-        if event["user_id"] == self.user_id:
-            message["type"] = "question.result"
-        else:
-            message["type"] = "opponent.answered"
-            del message["correct_answer"]
+    async def lobby_events(self, event: LobbyEventsEvent):
+        for lobby_event in event["events"]:
+            await self.dispatch(lobby_event)
 
-        self.send_json(message)
-
-    def determine_user_status_by_hp(self, users: list[tuple[UserId, HP]]) -> dict[UserId, GameStatus]:  # noqa
+    def determine_user_status_by_hp(self, users: dict[UserId, PlayerData]) -> dict[UserId, GameStatus]:  # noqa
         """
         Determine the win/loss/draw status of both users based on their hp.
 
         Args:
-            users: list of tuples of the user's id and hp
+            users: the users of the lobby, keyed by their ids
 
         Returns:
             A dictionary with keys and values corresponding to the users' ids and determined game statuses
 
         """
-        user1_id, user1_hp = users[0]
-        user2_id, user2_hp = users[1]
+        (user1_id, user1_data), (user2_id, user2_data) = users.items()
+        user1_hp, user2_hp = user1_data["hp"], user2_data["hp"]
 
         if user1_hp == user2_hp:
             user1_status = user2_status = GameStatus.DRAW
@@ -452,13 +588,61 @@ class GameConsumer(JsonWebsocketConsumer):
         }
 
     def determine_rank_gain_by_game_status(self, status: GameStatus) -> int:  # noqa
-        match status:
-            case GameStatus.WIN:
-                return settings.GAME_RANK_GAIN
-            case GameStatus.LOSS:
-                return -settings.GAME_RANK_GAIN
-            case GameStatus.DRAW:
-                return 0
+        try:
+            return GAME_STATUS_RANK_GAIN_MAP[status]
+        except KeyError:
+            raise Exception(f"Can not determine rank gain for an undefined game status: {status}")
+
+    def get_next_questions(self, trivia_token: str) -> tuple[QuestionDataEvent, list[CorrectAnswer]]:
+        """
+        Returns the next set of questions for the lobby.
+
+        Questions are obtained from the Trivia API directly, if the prefetched set is not available yet.
+
+        Args:
+            trivia_token: Trivia API token that is used for the current session of requests.
+
+        Returns:
+            A tuple containing the question.data event carrying the questions and the list of correct answers.
+        """
+        next_questions = Lobby.pop_next_questions(self.lobby_name)
+        if next_questions is None:
+            formatted_questions, correct_answers = self.get_and_format_questions(trivia_token)
+            question_data_event = self.make_question_data_event(formatted_questions)
+        else:
+            question_data, correct_answers = next_questions
+            question_data_event = {"type": "question.data", "text_data": question_data}
+
+        return question_data_event, correct_answers
+
+    def prefetch_questions(self, trivia_token: str) -> None:
+        """
+        Obtains the next set of questions for the lobby in the background.
+
+        Args:
+            trivia_token: Trivia API token that is used for the current session of requests.
+        """
+        future = question_prefetch_executor.submit(self.store_next_questions, self.lobby_name, trivia_token)
+        future.add_done_callback(log_prefetch_error)
+
+    def store_next_questions(self, lobby_name: str, trivia_token: str) -> None:
+        """
+        Obtains a set of questions from the Trivia API and stores it as the next set of questions of a lobby.
+
+        The questions are stored already formatted and encoded, so none of that work is left for the
+        moment the users run out of questions.
+        Nothing is stored if the API returned no questions, so the next set is then obtained directly.
+
+        Args:
+            lobby_name: name of the lobby the questions are stored for
+            trivia_token: Trivia API token that is used for the current session of requests.
+        """
+        formatted_questions, correct_answers = self.get_and_format_questions(trivia_token)
+        if not correct_answers:
+            return
+
+        question_data_event = self.make_question_data_event(formatted_questions)
+        Lobby.store_next_questions(lobby_name, question_data_event["text_data"], correct_answers)
 
     def get_and_format_questions(self, trivia_token: str) -> tuple[list[FormattedQuestion], list[CorrectAnswer]]:
         """
@@ -502,12 +686,14 @@ class GameConsumer(JsonWebsocketConsumer):
         Returns:
             A tuple of the formatted question and the correct answer
         """
+        correct_answer = html.unescape(question["correct_answer"])
+
         if question["type"] == "boolean":
             answers = ["True", "False"]
         else:
-            encoded_answers = chain(question["incorrect_answers"], (question["correct_answer"],))
-            decoded_answers = tuple(html.unescape(answer) for answer in encoded_answers)
-            answers = random.sample(decoded_answers, k=len(decoded_answers))
+            answers = [html.unescape(answer) for answer in question["incorrect_answers"]]
+            answers.append(correct_answer)
+            random.shuffle(answers)
 
         return {
             "category": question["category"],
@@ -516,4 +702,4 @@ class GameConsumer(JsonWebsocketConsumer):
             "difficulty": question["difficulty"],
             "duration": settings.QUESTION_MAX_DURATION_SECONDS_MAP[question["difficulty"]],
             "type": question["type"],
-        }, html.unescape(question["correct_answer"])
+        }, correct_answer
@@ -0,0 +1,40 @@
+-- Adds a connecting user to a lobby.
+--
+-- The lobby is checked and updated together, so two users connecting at the
+-- same time can not both take the last place in the lobby. The expiration time
+-- of the lobby is removed when its first user connects.
+--
+-- KEYS[1] - key of the lobby
+-- ARGV[1] - id of the connecting user
+-- ARGV[2] - JSON encoded player data of the user
+-- ARGV[3] - JSON encoded name of the channel the user's consumer is listening on
+--
+-- Returns the new user count of the lobby and the JSON encoded channel name of
+-- the user's opponent, if they are connected. Returns 0 if the lobby does not
+-- exist, is full or the user is already in it.
+
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+
+local user_ids = redis.call("JSON.OBJKEYS", KEYS[1], ".users")
+if #user_ids >= 2 then
+    return 0
+end
+
+for _, user_id in ipairs(user_ids) do
+    if user_id == ARGV[1] then
+        return 0
+    end
+end
+
+local user_path = '["' .. ARGV[1] .. '"]'
+redis.call("JSON.SET", KEYS[1], ".users" .. user_path, ARGV[2])
+redis.call("JSON.SET", KEYS[1], ".channel_names" .. user_path, ARGV[3])
+
+if #user_ids == 0 then
+    redis.call("PERSIST", KEYS[1])
+    return {1}
+end
+
+return {2, redis.call("JSON.GET", KEYS[1], '.channel_names["' .. user_ids[1] .. '"]')}
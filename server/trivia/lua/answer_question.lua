@@ -0,0 +1,21 @@
+-- Records a user's answer to the current question of a lobby.
+--
+-- The answer count and the user's hp are updated together, so two users
+-- answering at the same time can not both be counted as the first answer.
+--
+-- KEYS[1] - key of the lobby
+-- ARGV[1] - id of the user that answered the question
+-- ARGV[2] - damage that the user takes for their answer
+--
+-- Returns the new answer count of the current question and the
+-- JSON encoded users of the lobby.
+
+local damage = tonumber(ARGV[2])
+if damage ~= 0 then
+    redis.call("JSON.NUMINCRBY", KEYS[1], '.users["' .. ARGV[1] .. '"].hp', -damage)
+end
+
+local answer_count = redis.call("JSON.NUMINCRBY", KEYS[1], ".current_answer_count", 1)
+local users = redis.call("JSON.GET", KEYS[1], ".users")
+
+return {tonumber(answer_count), users}
@@ -0,0 +1,36 @@
+-- Removes a user from a lobby when their connection is closed.
+--
+-- The lobby and its stored next set of questions are deleted if the user was
+-- the last one in it. If a game was in progress, the lobby is marked as finished,
+-- since the remaining user wins.
+--
+-- KEYS[1] - key of the lobby
+-- KEYS[2] - key of the lobby's stored next set of questions
+-- ARGV[1] - id of the user that disconnected
+-- ARGV[2] - value of the in progress lobby state
+-- ARGV[3] - value of the finished lobby state
+--
+-- Returns the id of the remaining user and the ranked flag of the lobby
+-- if the disconnect ended a game in progress, nil otherwise.
+
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return nil
+end
+
+if redis.call("JSON.OBJLEN", KEYS[1], ".users") <= 1 then
+    redis.call("DEL", KEYS[1], KEYS[2])
+    return nil
+end
+
+local user_path = '["' .. ARGV[1] .. '"]'
+redis.call("JSON.DEL", KEYS[1], ".users" .. user_path)
+redis.call("JSON.DEL", KEYS[1], ".channel_names" .. user_path)
+
+if tonumber(redis.call("JSON.GET", KEYS[1], ".state")) ~= tonumber(ARGV[2]) then
+    return nil
+end
+
+redis.call("JSON.SET", KEYS[1], ".state", ARGV[3])
+
+local opponent_user_id = redis.call("JSON.OBJKEYS", KEYS[1], ".users")[1]
+return {opponent_user_id, tonumber(redis.call("JSON.GET", KEYS[1], ".ranked"))}
@@ -0,0 +1,12 @@
+-- Gets the correct answer of the question that a lobby is currently on.
+--
+-- KEYS[1] - key of the lobby
+--
+-- Returns the JSON encoded correct answer, or nil if the lobby does not exist.
+
+local current_question_count = redis.call("JSON.GET", KEYS[1], ".current_question_count")
+if not current_question_count then
+    return nil
+end
+
+return redis.call("JSON.GET", KEYS[1], ".correct_answers[" .. current_question_count .. "]")
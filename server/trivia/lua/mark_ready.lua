@@ -0,0 +1,16 @@
+-- Marks a user of a lobby as ready to start the game.
+--
+-- The ready count is only incremented while the lobby has both of its users
+-- and the game has not been started, so it can never go past two.
+--
+-- KEYS[1] - key of the lobby
+--
+-- Returns the new ready count of the lobby, or 0 if the user could not be marked as ready.
+
+local user_count = redis.call("JSON.OBJLEN", KEYS[1], ".users")
+local ready_count = tonumber(redis.call("JSON.GET", KEYS[1], ".ready_count"))
+if user_count ~= 2 or ready_count >= 2 then
+    return 0
+end
+
+return tonumber(redis.call("JSON.NUMINCRBY", KEYS[1], ".ready_count", 1))
@@ -1,10 +1,16 @@
-from datetime import datetime
-from typing import Dict
+import json
+from pathlib import Path
+from typing import Dict, Optional
 
+import orjson
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
-from redis_om import Field, JsonModel, Migrator
+from pydantic import parse_obj_as, parse_raw_as
+from redis import BlockingConnectionPool, Redis
+from redis_om import Field, JsonModel
 from trivia.types import (
+    HP,
     CorrectAnswer,
     GameStatus,
     GameType,
@@ -15,6 +21,14 @@ from trivia.types import (
 
 User = get_user_model()
 
+LUA_SCRIPTS_DIR = Path(__file__).resolve().parent / "lua"
+
+# Connection pool shared by every redis operation in the process, connections
+# are reused between operations and the number of open connections is bounded.
+redis_connection_pool = BlockingConnectionPool.from_url(
+    settings.REDIS_OM_URL, max_connections=settings.REDIS_MAX_CONNECTIONS, decode_responses=True
+)
+
 
 class Lobby(JsonModel):
     """
@@ -25,19 +39,193 @@ class Lobby(JsonModel):
     name: str = Field(primary_key=True)
     ready_count: int = 0
     users: Dict[UserId, PlayerData] = {}
+    channel_names: Dict[UserId, str] = {}  # names of the channels the users' consumers are listening on
     current_answer_count: int = 0
     current_question_count: int = 0
     state: LobbyState = LobbyState.WAITING
     ranked: int = Field(index=True, default=0)  # tracks whether the lobby is ranked (1) or normal (0)
     trivia_token: str = ""
     correct_answers: list[CorrectAnswer] = []
-    game_start_time: datetime = 0
-    question_start_time: datetime = 0
+    game_start_time: int = 0  # milliseconds since the epoch
+    question_start_time: int = 0  # milliseconds since the epoch
+
+    class Meta:
+        database = Redis(connection_pool=redis_connection_pool)
+
+    @classmethod
+    def record_answer(cls, name: str, user_id: UserId, damage: HP) -> tuple[int, Dict[UserId, PlayerData]]:
+        """
+        Atomically record a user's answer to the current question of a stored lobby.
+
+        Damages the user by the given amount and increments the answer count of the current question.
+
+        Args:
+            name: name (primary key) of the lobby
+            user_id: id of the user that answered the question
+            damage: amount of hp the user loses for their answer
+
+        Returns:
+            A tuple of the new answer count and the updated users of the lobby
+        """
+        answer_count, users = _record_answer_script(keys=[cls.make_primary_key(name)], args=[user_id, damage])
+        return answer_count, parse_raw_as(Dict[UserId, PlayerData], users)
+
+    @classmethod
+    def add_user(
+        cls, name: str, user_id: UserId, player_data: PlayerData, channel_name: str
+    ) -> tuple[int, Optional[str]]:
+        """
+        Atomically add a connecting user to a stored lobby.
+
+        The expiration time of the lobby is removed when its first user is added.
+
+        Args:
+            name: name (primary key) of the lobby
+            user_id: id of the connecting user
+            player_data: in game data of the user
+            channel_name: name of the channel the user's consumer is listening on
+
+        Returns:
+            A tuple of the new user count of the lobby and the channel name of the user's
+            opponent if they are connected. The user count is 0 if the user could not be added,
+            because the lobby does not exist, is full or the user is already in it.
+        """
+        result = _add_user_script(
+            keys=[cls.make_primary_key(name)], args=[user_id, orjson.dumps(player_data), orjson.dumps(channel_name)]
+        )
+        if not result:
+            return 0, None
+
+        user_count, *opponent_channel_name = result
+        return user_count, orjson.loads(opponent_channel_name[0]) if opponent_channel_name else None
+
+    @classmethod
+    def mark_ready(cls, name: str) -> int:
+        """
+        Atomically mark one of the users of a stored lobby as ready to start the game.
+
+        Args:
+            name: name (primary key) of the lobby
+
+        Returns:
+            The new ready count of the lobby, or 0 if the lobby does not have two users
+            or both of its users are already ready
+        """
+        return _mark_ready_script(keys=[cls.make_primary_key(name)])
+
+    @classmethod
+    def get_current_correct_answer(cls, name: str) -> Optional[CorrectAnswer]:
+        """
+        Get the correct answer of the current question of a stored lobby, without loading the whole lobby.
+
+        Args:
+            name: name (primary key) of the lobby
+
+        Returns:
+            The correct answer of the current question, or None if the lobby does not exist
+        """
+        correct_answer = _get_current_correct_answer_script(keys=[cls.make_primary_key(name)])
+        if correct_answer is None:
+            return None
+
+        return parse_raw_as(CorrectAnswer, correct_answer)
 
+    @classmethod
+    def disconnect_user(cls, name: str, user_id: UserId) -> Optional[tuple[UserId, bool]]:
+        """
+        Atomically remove a disconnected user from a stored lobby.
 
-# Before we can run queries, we need to run migrations to set up the
-# indexes that Redis OM will use.
-Migrator().run()
+        The lobby and its stored next set of questions are deleted if the user was the last one in it.
+        If a game was in progress, the lobby is marked as finished.
+
+        Args:
+            name: name (primary key) of the lobby
+            user_id: id of the user that disconnected
+
+        Returns:
+            A tuple of the id of the remaining user and whether the lobby is ranked,
+            if the disconnect ended a game in progress, None otherwise
+        """
+        game_end = _disconnect_user_script(
+            keys=[cls.make_primary_key(name), cls.make_next_questions_key(name)],
+            args=[user_id, LobbyState.IN_PROGRESS.value, LobbyState.FINISHED.value],
+        )
+        if game_end is None:
+            return None
+
+        opponent_user_id, ranked = game_end
+        return int(opponent_user_id), bool(ranked)
+
+    @classmethod
+    def make_next_questions_key(cls, name: str) -> str:
+        """Returns the key under which the next set of questions of a lobby is stored"""
+        return f"next_questions:{cls.make_primary_key(name)}"
+
+    @classmethod
+    def store_next_questions(cls, name: str, question_data: str, correct_answers: list[CorrectAnswer]) -> None:
+        """
+        Store a set of questions that is handed out to the users of a lobby once they exhaust their current questions.
+
+        The questions are stored as the already encoded question.data message, so they can be sent to
+        the users as is. They are kept separately from the lobby document, so they are not loaded on every
+        lobby access.
+
+        Args:
+            name: name (primary key) of the lobby
+            question_data: the encoded question.data message carrying the questions
+            correct_answers: the correct answers of the questions
+        """
+        cls.db().set(
+            cls.make_next_questions_key(name),
+            orjson.dumps(
+                {"question_data": question_data, "correct_answers": [tuple(answer) for answer in correct_answers]}
+            ),
+            ex=settings.GAME_MAX_DURATION_SECONDS,
+        )
+
+    @classmethod
+    def pop_next_questions(cls, name: str) -> Optional[tuple[str, list[CorrectAnswer]]]:
+        """
+        Remove and return the stored next set of questions of a lobby.
+
+        Args:
+            name: name (primary key) of the lobby
+
+        Returns:
+            A tuple of the encoded question.data message and the correct answers of its questions,
+            or None if no questions are stored
+        """
+        next_questions = cls.db().getdel(cls.make_next_questions_key(name))
+        if next_questions is None:
+            return None
+
+        next_questions = orjson.loads(next_questions)
+        return next_questions["question_data"], parse_obj_as(list[CorrectAnswer], next_questions["correct_answers"])
+
+    def save_fields(self, *fields: str) -> None:
+        """
+        Store only the given fields of the lobby, instead of rewriting the whole document.
+
+        All fields are written with a single round trip to redis.
+
+        Args:
+            fields: names of the fields to be stored
+        """
+        values = json.loads(self.json(include=set(fields)))
+
+        pipeline = self.db().json().pipeline(transaction=False)
+        for field, value in values.items():
+            pipeline.set(self.key(), f".{field}", value)
+        pipeline.execute()
+
+
+_add_user_script = Lobby.db().register_script((LUA_SCRIPTS_DIR / "add_user.lua").read_text())
+_record_answer_script = Lobby.db().register_script((LUA_SCRIPTS_DIR / "answer_question.lua").read_text())
+_mark_ready_script = Lobby.db().register_script((LUA_SCRIPTS_DIR / "mark_ready.lua").read_text())
+_disconnect_user_script = Lobby.db().register_script((LUA_SCRIPTS_DIR / "disconnect_user.lua").read_text())
+_get_current_correct_answer_script = Lobby.db().register_script(
+    (LUA_SCRIPTS_DIR / "get_current_correct_answer.lua").read_text()
+)
 
 
 class Game(models.Model):
@@ -68,8 +256,7 @@ class Game(models.Model):
             user1_game = UserGame(user=user1, opponent=user2, game=game, status=user1_status, rank=user1.rank)
             user2_game = UserGame(user=user2, opponent=user1, game=game, status=user2_status, rank=user2.rank)
 
-            user1_game.save()
-            user2_game.save()
+            UserGame.objects.bulk_create([user1_game, user2_game])
 
             return game, user1_game, user2_game
 
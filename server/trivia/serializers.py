@@ -16,7 +16,8 @@ class LobbySerializer(serializers.Serializer):  # noqa
         return len(lobby.users)
 
     def validate_name(self, value: str):
-        if any(Lobby.find(Lobby.name == value).all()):
+        # name is the primary key of lobbies, so a key lookup is enough, without going through the search index
+        if Lobby.db().exists(Lobby.make_primary_key(value)):
             raise serializers.ValidationError("Lobby with the given name already exists")
         return value
 
@@ -0,0 +1,18 @@
+from functools import cache
+
+import orjson
+from django.conf import settings
+from trivia.types import TriviaAPIQuestion
+
+FIXTURES_PATH = settings.BASE_DIR / "fixtures"
+
+
+@cache
+def load_questions_fixture() -> list[TriviaAPIQuestion]:
+    """
+    Load the Trivia API questions fixture.
+
+    The fixture is read and parsed once per test run. Test cases that assign the questions
+    in setUpTestData get a separate copy in every test, so the shared questions are never modified.
+    """
+    return orjson.loads((FIXTURES_PATH / "questions.json").read_bytes())
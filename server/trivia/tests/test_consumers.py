@@ -1,19 +1,18 @@
 import html
 import json
-from datetime import datetime, timedelta
-from unittest.mock import ANY, MagicMock, call, patch
+from concurrent.futures import Future
+from unittest.mock import ANY, AsyncMock, MagicMock, call, patch
 
-from channels.auth import AuthMiddlewareStack
-from channels.exceptions import AcceptConnection, DenyConnection
-from channels.routing import URLRouter
-from core.settings.base import BASE_DIR
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.exceptions import DenyConnection
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
-from redis_om import get_redis_connection
+from django.test import SimpleTestCase, TestCase
 from redis_om.model.model import NotFoundError
-from trivia.consumers import GameConsumer
+from trivia.consumers import QUESTION_PREFETCH_COUNT, GameConsumer, log_prefetch_error
 from trivia.models import Game, Lobby, UserGame
+from trivia.tests import load_questions_fixture
 from trivia.types import (
     ClientEvent,
     CorrectAnswer,
@@ -25,15 +24,11 @@ from trivia.types import (
     QuestionAnsweredEvent,
     TriviaAPIQuestion,
 )
-from trivia.urls import websocket_urlpatterns
-from trivia.utils import generate_lobby_token
-
-FIXTURES_PATH = BASE_DIR / "fixtures"
-
-application = AuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+from trivia.utils import TriviaAPIError, generate_lobby_token, get_current_time_ms
 
 User = get_user_model()
-redis = get_redis_connection()
+# the tests share the connection pool of the lobby model, instead of opening their own connections
+redis = Lobby.db()
 
 
 class GameConsumerTestCase(TestCase):
@@ -41,14 +36,16 @@ class GameConsumerTestCase(TestCase):
 
     @classmethod
     def setUpTestData(cls):
-        with open(FIXTURES_PATH / "questions.json") as file:
-            cls.questions = json.load(file)
+        cls.questions = load_questions_fixture()
 
         cls.lobby_name = "TEST_LOBBY_NAME"
+        cls.user1, cls.user2 = User.objects.all()[:2]
 
-    def setUp(self):
-        self.user1, self.user2 = User.objects.all()[:2]
+        # questions are formatted once per test case, every test gets its own copy of them
+        with patch("trivia.consumers.TriviaAPIClient.get_questions", return_value=cls.questions):
+            cls.formatted_questions, cls.correct_answers = GameConsumer().get_and_format_questions("FAKE_TOKEN")
 
+    def setUp(self):
         self.user1_token = generate_lobby_token(self.user1, self.lobby_name)
         self.user2_token = generate_lobby_token(self.user2, self.lobby_name)
 
@@ -63,37 +60,59 @@ class GameConsumerTestCase(TestCase):
                 "hp": 100,
             },
         }
+        lobby.channel_names = {self.user1.id: "USER1_CHANNEL_NAME", self.user2.id: "USER2_CHANNEL_NAME"}
         lobby.save()
+        self.lobby = lobby
 
         self.get_questions_patcher = patch("trivia.consumers.TriviaAPIClient.get_questions")
         self.get_token_patcher = patch("trivia.consumers.TriviaAPIClient.get_token")
         self.send_event_to_lobby_patcher = patch("trivia.consumers.GameConsumer.send_event_to_lobby")
+        self.send_events_to_lobby_patcher = patch("trivia.consumers.GameConsumer.send_events_to_lobby")
         self.send_json_patcher = patch("trivia.consumers.GameConsumer.send_json")
+        self.prefetch_questions_patcher = patch("trivia.consumers.GameConsumer.prefetch_questions")
 
         self.mock_get_questions = self.get_questions_patcher.start()
         self.mock_get_token = self.get_token_patcher.start()
         self.mock_send_event_to_lobby = self.send_event_to_lobby_patcher.start()
+        self.mock_send_events_to_lobby = self.send_events_to_lobby_patcher.start()
         self.mock_send_json = self.send_json_patcher.start()
+        self.mock_prefetch_questions = self.prefetch_questions_patcher.start()
 
-        self.mock_get_questions.return_value = self.questions
         self.mock_get_token.return_value = "FAKE_TOKEN"
 
         self.game_consumer = GameConsumer()
         self.game_consumer.scope = {"query_string": b"", "url_route": {"kwargs": {"lobby_name": self.lobby_name}}}
         self.game_consumer.lobby_name = self.lobby_name
-        self.game_consumer.channel_layer = MagicMock()
-        self.game_consumer.channel_name = MagicMock()
-
-        self.formatted_questions, self.correct_answers = self.game_consumer.get_and_format_questions("FAKE_TOKEN")
+        self.game_consumer.channel_layer = AsyncMock()
+        self.game_consumer.channel_name = "TEST_CHANNEL_NAME"
 
     def tearDown(self):
         self.get_questions_patcher.stop()
         self.get_token_patcher.stop()
         self.send_event_to_lobby_patcher.stop()
+        self.send_events_to_lobby_patcher.stop()
         self.send_json_patcher.stop()
+        self.prefetch_questions_patcher.stop()
 
-        for key in redis.scan_iter("*"):
-            redis.delete(key)
+        # keys are removed with a single command, flushing the database would also drop the lobby search index
+        keys = redis.keys()
+        if keys:
+            redis.unlink(*keys)
+
+    def remove_user2_from_lobby(self) -> Lobby:
+        """
+        Leave only the first user in the stored lobby, the state most connect and ready tests start from.
+
+        Only the users and channel_names fields are rewritten, the lobby built in setUp is reused
+        instead of being loaded again.
+
+        Returns:
+            The updated lobby
+        """
+        del self.lobby.users[self.user2.id]
+        del self.lobby.channel_names[self.user2.id]
+        self.lobby.save_fields("users", "channel_names")
+        return self.lobby
 
     def test_unauthenticated_user_connect(self):
         lobby = Lobby.get(self.lobby_name)
@@ -101,7 +120,7 @@ class GameConsumerTestCase(TestCase):
         lobby.save()
 
         with self.assertRaises(DenyConnection):
-            self.game_consumer.connect()
+            async_to_sync(self.game_consumer.connect)()
 
     def test_authenticated_user_with_token_for_wrong_lobby_connect(self):
         self.game_consumer.scope["query_string"] = generate_lobby_token(self.user1, "SOME_OTHER_LOBBY").encode()
@@ -111,122 +130,152 @@ class GameConsumerTestCase(TestCase):
         lobby.save()
 
         with self.assertRaises(DenyConnection):
-            self.game_consumer.connect()
+            async_to_sync(self.game_consumer.connect)()
 
-    @patch("trivia.consumers.async_to_sync")
-    def test_authenticated_user_connect(self, mock_async_to_sync: MagicMock):
+    @patch("trivia.consumers.GameConsumer.send")
+    @patch("trivia.consumers.GameConsumer.accept")
+    def test_authenticated_user_connect(self, mock_accept: AsyncMock, mock_send: AsyncMock):
         self.game_consumer.scope["query_string"] = self.user1_token.encode()
 
         lobby = Lobby.get(self.lobby_name)
         lobby.users = {}
         lobby.save()
+        lobby.db().expire(lobby.key(), settings.LOBBY_EXPIRE_SECONDS)
 
-        with self.assertRaises(AcceptConnection):
-            self.game_consumer.connect()
+        async_to_sync(self.game_consumer.connect)()
+
+        lobby_after_call = Lobby.get(self.lobby_name)
+        self.assertEqual(lobby.db().ttl(lobby.key()), -1)
 
-        mock_async_to_sync.assert_called_once_with(self.game_consumer.channel_layer.group_add)
+        self.assertEqual(lobby_after_call.channel_names[self.user1.id], self.game_consumer.channel_name)
+        self.game_consumer.channel_layer.group_add.assert_awaited_once_with(
+            self.lobby_name, self.game_consumer.channel_name
+        )
+        mock_accept.assert_awaited_once()
+        mock_send.assert_not_called()
+        self.game_consumer.channel_layer.send.assert_not_called()
 
     def test_user_connect_to_invalid_lobby(self):
         self.game_consumer.scope["url_route"]["kwargs"]["lobby_name"] = "INVALID_LOBBY_NAME"
+        self.game_consumer.scope["query_string"] = generate_lobby_token(self.user1, "INVALID_LOBBY_NAME").encode()
 
         with self.assertRaises(DenyConnection):
-            self.game_consumer.connect()
+            async_to_sync(self.game_consumer.connect)()
 
-    @patch("trivia.consumers.async_to_sync")
-    def test_second_user_connect(self, mock_async_to_sync: MagicMock):
+    @patch("trivia.consumers.GameConsumer.send")
+    @patch("trivia.consumers.GameConsumer.accept")
+    def test_second_user_connect(self, mock_accept: AsyncMock, mock_send: AsyncMock):
         self.game_consumer.scope["query_string"] = self.user2_token.encode()
 
-        lobby = Lobby.get(self.lobby_name)
-        del lobby.users[self.user2.id]
-        lobby.save()
+        self.remove_user2_from_lobby()
 
-        with self.assertRaises(AcceptConnection):
-            self.game_consumer.connect()
+        async_to_sync(self.game_consumer.connect)()
 
-        mock_async_to_sync.assert_called_once_with(self.game_consumer.channel_layer.group_add)
-        self.mock_send_event_to_lobby.assert_called_once_with("game.prepare")
+        lobby_after_call = Lobby.get(self.lobby_name)
+
+        self.assertEqual(lobby_after_call.channel_names[self.user2.id], self.game_consumer.channel_name)
+        self.game_consumer.channel_layer.group_add.assert_awaited_once_with(
+            self.lobby_name, self.game_consumer.channel_name
+        )
+        mock_accept.assert_awaited_once()
+        mock_send.assert_awaited_once_with(text_data=ANY)
+        self.assertEqual(json.loads(mock_send.call_args.kwargs["text_data"]), {"type": "game.prepare"})
+        self.game_consumer.channel_layer.send.assert_awaited_once_with("USER1_CHANNEL_NAME", {"type": "game.prepare"})
 
     def test_more_than_two_users_connect(self):
         user3 = User.objects.all()[2]
-        self.game_consumer.scope["query_string"] = generate_lobby_token(user3, self.lobby_name)
+        self.game_consumer.scope["query_string"] = generate_lobby_token(user3, self.lobby_name).encode()
 
         with self.assertRaises(DenyConnection):
-            self.game_consumer.connect()
+            async_to_sync(self.game_consumer.connect)()
+
+        self.assertNotIn(user3.id, Lobby.get(self.lobby_name).users)
 
     def test_same_user_connect_second_time(self):
         self.game_consumer.scope["query_string"] = self.user1_token.encode()
 
-        lobby = Lobby.get(self.lobby_name)
-        del lobby.users[self.user2.id]
-        lobby.save()
+        self.remove_user2_from_lobby()
 
         with self.assertRaises(DenyConnection):
-            self.game_consumer.connect()
+            async_to_sync(self.game_consumer.connect)()
 
-    @patch("trivia.consumers.async_to_sync")
-    def test_unauthenticated_user_disconnect(self, mock_async_to_sync: MagicMock):
+    def test_unauthenticated_user_disconnect(self):
         expected_lobby = Lobby.get(self.lobby_name)
 
-        self.game_consumer.disconnect(1006)
+        async_to_sync(self.game_consumer.disconnect)(1006)
 
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
-        mock_async_to_sync.assert_not_called()
+        self.game_consumer.channel_layer.group_discard.assert_not_called()
 
-    @patch("trivia.consumers.async_to_sync")
-    def test_last_user_disconnect(self, mock_async_to_sync: MagicMock):
-        lobby = Lobby.get(self.lobby_name)
-        del lobby.users[self.user2.id]
-        lobby.save()
+    def test_last_user_disconnect(self):
+        self.remove_user2_from_lobby()
+        Lobby.store_next_questions(self.lobby_name, "QUESTION_DATA", self.correct_answers)
         self.game_consumer.user_id = self.user1.id
 
-        self.game_consumer.disconnect(1000)
+        async_to_sync(self.game_consumer.disconnect)(1000)
 
-        mock_async_to_sync.assert_called_once_with(self.game_consumer.channel_layer.group_discard)
+        self.game_consumer.channel_layer.group_discard.assert_awaited_once_with(
+            self.lobby_name, self.game_consumer.channel_name
+        )
         with self.assertRaises(NotFoundError):
             Lobby.get(self.lobby_name)
+        self.assertIsNone(Lobby.pop_next_questions(self.lobby_name))
 
-    @patch("trivia.consumers.async_to_sync")
-    def test_first_user_disconnect(self, mock_async_to_sync: MagicMock):
+    def test_first_user_disconnect(self):
         self.game_consumer.user_id = self.user2.id
 
-        self.game_consumer.disconnect(1000)
+        async_to_sync(self.game_consumer.disconnect)(1000)
 
-        mock_async_to_sync.assert_called_once_with(self.game_consumer.channel_layer.group_discard)
+        self.game_consumer.channel_layer.group_discard.assert_awaited_once_with(
+            self.lobby_name, self.game_consumer.channel_name
+        )
         lobby = Lobby.get(self.lobby_name)
         self.assertIsNone(lobby.users.get(self.user2.id))
+        self.assertIsNone(lobby.channel_names.get(self.user2.id))
 
     @patch("trivia.consumers.GameConsumer.handle_game_end")
-    @patch("trivia.consumers.async_to_sync")
-    def test_user_disconnect_when_game_in_progress(
-        self, mock_async_to_sync: MagicMock, mock_handle_game_end: MagicMock
-    ):
+    def test_user_disconnect_when_game_in_progress(self, mock_handle_game_end: AsyncMock):
         self.game_consumer.user_id = self.user1.id
 
         lobby = Lobby.get(self.lobby_name)
         lobby.state = LobbyState.IN_PROGRESS
+        lobby.ranked = 1
         lobby.save()
 
-        self.game_consumer.disconnect(1000)
+        async_to_sync(self.game_consumer.disconnect)(1000)
 
-        mock_async_to_sync.assert_called_once_with(self.game_consumer.channel_layer.group_discard)
-        mock_handle_game_end.assert_called_once_with({self.user1.id: GameStatus.LOSS, self.user2.id: GameStatus.WIN})
+        self.game_consumer.channel_layer.group_discard.assert_awaited_once_with(
+            self.lobby_name, self.game_consumer.channel_name
+        )
+        mock_handle_game_end.assert_called_once_with(
+            {self.user1.id: GameStatus.LOSS, self.user2.id: GameStatus.WIN}, True
+        )
+        lobby_after_call = Lobby.get(self.lobby_name)
+        self.assertEqual(lobby_after_call.state, LobbyState.FINISHED)
+        self.assertEqual(list(lobby_after_call.users), [self.user2.id])
+        self.assertEqual(list(lobby_after_call.channel_names), [self.user2.id])
 
-    def test_receive_game_ready_only_one_user_in_lobby(self):
-        lobby = Lobby.get(self.lobby_name)
-        del lobby.users[self.user2.id]
-        lobby.save()
+    @patch("trivia.consumers.GameConsumer.handle_game_end")
+    def test_user_disconnect_when_game_not_started(self, mock_handle_game_end: AsyncMock):
+        self.game_consumer.user_id = self.user1.id
 
-        expected_lobby = lobby
+        async_to_sync(self.game_consumer.disconnect)(1000)
+
+        mock_handle_game_end.assert_not_called()
+        self.assertEqual(Lobby.get(self.lobby_name).state, LobbyState.WAITING)
+
+    def test_receive_game_ready_only_one_user_in_lobby(self):
+        expected_lobby = self.remove_user2_from_lobby()
 
         content: ClientEvent = {"type": "game.ready"}
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
 
         lobby_after_call = Lobby.get(self.lobby_name)
         self.assertEqual(expected_lobby, lobby_after_call)
-        self.mock_send_event_to_lobby.assert_not_called()
+        self.mock_send_events_to_lobby.assert_not_called()
 
     def test_receive_game_ready_first_user(self):
         expected_lobby = Lobby.get(self.lobby_name)
@@ -234,13 +283,13 @@ class GameConsumerTestCase(TestCase):
 
         content: ClientEvent = {"type": "game.ready"}
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
 
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertTrue(self.game_consumer.ready_sent)
         self.assertEqual(expected_lobby, lobby_after_call)
-        self.mock_send_event_to_lobby.assert_not_called()
+        self.mock_send_events_to_lobby.assert_not_called()
 
     def test_receive_game_ready_second_time_by_same_user(self):
         self.game_consumer.ready_sent = True
@@ -253,16 +302,33 @@ class GameConsumerTestCase(TestCase):
 
         content: ClientEvent = {"type": "game.ready"}
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
 
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
-        self.mock_send_event_to_lobby.assert_not_called()
+        self.mock_send_events_to_lobby.assert_not_called()
 
-    @patch("trivia.consumers.datetime")
-    def test_receive_game_ready_second_user(self, mock_datetime):
-        mock_datetime.now.return_value = datetime.now()
+    def test_receive_game_ready_both_users_already_ready(self):
+        lobby = Lobby.get(self.lobby_name)
+        lobby.ready_count = 2
+        lobby.save()
+
+        expected_lobby = lobby
+
+        content: ClientEvent = {"type": "game.ready"}
+
+        async_to_sync(self.game_consumer.receive_json)(content)
+
+        lobby_after_call = Lobby.get(self.lobby_name)
+
+        self.assertFalse(self.game_consumer.ready_sent)
+        self.assertEqual(expected_lobby, lobby_after_call)
+        self.mock_send_events_to_lobby.assert_not_called()
+
+    @patch("trivia.consumers.get_current_time_ms")
+    def test_receive_game_ready_second_user(self, mock_get_current_time_ms):
+        mock_get_current_time_ms.return_value = get_current_time_ms()
 
         lobby = Lobby.get(self.lobby_name)
         lobby.ready_count = 1
@@ -272,34 +338,50 @@ class GameConsumerTestCase(TestCase):
         expected_lobby.ready_count = 2
         expected_lobby.trivia_token = self.mock_get_token.return_value
         expected_lobby.state = LobbyState.IN_PROGRESS
-        expected_lobby.game_start_time = mock_datetime.now.return_value
-        expected_lobby.question_start_time = mock_datetime.now.return_value
+        expected_lobby.game_start_time = mock_get_current_time_ms.return_value
+        expected_lobby.question_start_time = mock_get_current_time_ms.return_value
         expected_lobby.correct_answers = self.correct_answers
 
         content: ClientEvent = {"type": "game.ready"}
 
         with patch("trivia.consumers.GameConsumer.get_and_format_questions") as mock_get_and_format_questions:
             mock_get_and_format_questions.return_value = (self.formatted_questions, self.correct_answers)
-            self.game_consumer.receive_json(content)
+            async_to_sync(self.game_consumer.receive_json)(content)
 
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertTrue(self.game_consumer.ready_sent)
         self.assertEqual(expected_lobby, lobby_after_call)
-        self.mock_send_event_to_lobby.assert_has_calls(
-            (
-                call(
-                    "game.start",
-                    {
-                        "users": {str(self.user1.id): self.user2.username, str(self.user2.id): self.user1.username},
-                        "duration": settings.GAME_MAX_DURATION_SECONDS,
-                    },
-                ),
-                call("question.data", {"questions": self.formatted_questions}),
-                call("question.next"),
-            ),
-            any_order=False,
+        self.mock_send_events_to_lobby.assert_called_once_with(
+            {
+                "type": "game.start",
+                "users": {str(self.user1.id): self.user2.username, str(self.user2.id): self.user1.username},
+                "duration": settings.GAME_MAX_DURATION_SECONDS,
+            },
+            self.game_consumer.make_question_data_event(self.formatted_questions),
+            {"type": "question.next"},
+        )
+        self.mock_prefetch_questions.assert_not_called()
+
+    def test_receive_game_ready_second_user_trivia_api_error(self):
+        self.game_consumer.handle_game_end = AsyncMock()
+
+        lobby = Lobby.get(self.lobby_name)
+        lobby.ready_count = 1
+        lobby.save()
+
+        content: ClientEvent = {"type": "game.ready"}
+
+        with patch("trivia.consumers.GameConsumer.get_and_format_questions") as mock_get_and_format_questions:
+            mock_get_and_format_questions.side_effect = TriviaAPIError("Trivia API responded with code 5")
+            async_to_sync(self.game_consumer.receive_json)(content)
+
+        self.assertEqual(Lobby.get(self.lobby_name).state, LobbyState.FINISHED)
+        self.game_consumer.handle_game_end.assert_called_once_with(
+            {self.user1.id: GameStatus.DRAW, self.user2.id: GameStatus.DRAW}, True
         )
+        self.mock_send_events_to_lobby.assert_not_called()
+        self.mock_prefetch_questions.assert_not_called()
 
     def test_receive_question_answered_more_than_once_by_same_user(self):
         lobby = Lobby.get(self.lobby_name)
@@ -311,11 +393,36 @@ class GameConsumerTestCase(TestCase):
         content: QuestionAnsweredEvent = {"type": "question.answered", "answer": "RANDOM_ANSWER"}
         self.game_consumer.question_answered = True
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
 
         lobby_after_call = Lobby.get(self.lobby_name)
         self.assertEqual(expected_lobby, lobby_after_call)
+        self.mock_send_json.assert_not_called()
+        self.game_consumer.channel_layer.send.assert_not_called()
+
+    def test_receive_json_unknown_event_type(self):
+        content: ClientEvent = {"type": "UNKNOWN.TYPE"}
+
+        async_to_sync(self.game_consumer.receive_json)(content)
+
         self.mock_send_event_to_lobby.assert_not_called()
+        self.mock_send_json.assert_not_called()
+
+    def test_receive_question_answered_without_answer(self):
+        self.game_consumer.user_id = self.user1.id
+
+        expected_lobby = Lobby.get(self.lobby_name)
+
+        content: ClientEvent = {"type": "question.answered"}
+
+        async_to_sync(self.game_consumer.receive_json)(content)
+
+        lobby_after_call = Lobby.get(self.lobby_name)
+
+        self.assertEqual(expected_lobby, lobby_after_call)
+        self.assertFalse(self.game_consumer.question_answered)
+        self.mock_send_json.assert_not_called()
+        self.game_consumer.channel_layer.send.assert_not_called()
 
     def test_receive_question_answered_correct_answer(self):
         self.game_consumer.user_id = self.user1.id
@@ -323,7 +430,7 @@ class GameConsumerTestCase(TestCase):
         lobby = Lobby.get(self.lobby_name)
         lobby.correct_answers = self.correct_answers
         lobby.current_question_count = 0
-        lobby.question_start_time = datetime.now()
+        lobby.question_start_time = get_current_time_ms()
         lobby.save()
 
         expected_lobby = lobby
@@ -334,20 +441,23 @@ class GameConsumerTestCase(TestCase):
             "answer": expected_lobby.correct_answers[0].answer,
         }
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
 
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
         self.assertEqual(self.game_consumer.question_answered, True)
-        self.mock_send_event_to_lobby.assert_called_once_with(
-            "user.answered",
+        self.mock_send_json.assert_called_once_with(
             {
-                "user_id": self.user1.id,
+                "type": "question.result",
                 "correctly": True,
                 "correct_answer": expected_lobby.correct_answers[0].answer,
                 "damage": 0,
-            },
+            }
+        )
+        self.game_consumer.channel_layer.send.assert_awaited_once_with(
+            "USER2_CHANNEL_NAME",
+            {"type": "opponent.answered", "correctly": True, "damage": 0},
         )
 
     def test_receive_question_answered_incorrect_answer(self):
@@ -356,7 +466,7 @@ class GameConsumerTestCase(TestCase):
         lobby = Lobby.get(self.lobby_name)
         lobby.correct_answers = self.correct_answers
         lobby.current_question_count = 0
-        lobby.question_start_time = datetime.now()
+        lobby.question_start_time = get_current_time_ms()
         lobby.save()
 
         expected_lobby = lobby
@@ -370,24 +480,31 @@ class GameConsumerTestCase(TestCase):
             "answer": "INCORRECT_ANSWER",
         }
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
 
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
         self.assertEqual(self.game_consumer.question_answered, True)
-        self.mock_send_event_to_lobby.assert_called_once_with(
-            "user.answered",
+        self.mock_send_json.assert_called_once_with(
             {
-                "user_id": self.user1.id,
+                "type": "question.result",
                 "correctly": False,
                 "correct_answer": expected_lobby.correct_answers[0].answer,
                 "damage": settings.QUESTION_DIFFICULTY_DAMAGE_MAP[expected_lobby.correct_answers[0].difficulty],
+            }
+        )
+        self.game_consumer.channel_layer.send.assert_awaited_once_with(
+            "USER2_CHANNEL_NAME",
+            {
+                "type": "opponent.answered",
+                "correctly": False,
+                "damage": settings.QUESTION_DIFFICULTY_DAMAGE_MAP[expected_lobby.correct_answers[0].difficulty],
             },
         )
 
-    @patch("trivia.consumers.datetime")
-    def test_receive_question_answered_after_max_question_duration(self, mock_datetime):
+    @patch("trivia.consumers.get_current_time_ms")
+    def test_receive_question_answered_after_max_question_duration(self, mock_get_current_time_ms):
         self.game_consumer.user_id = self.user1.id
 
         lobby = Lobby.get(self.lobby_name)
@@ -395,7 +512,7 @@ class GameConsumerTestCase(TestCase):
             CorrectAnswer(answer=str(i), difficulty="easy") for i in range(settings.TRIVIA_API_QUESTION_AMOUNT)
         ]
         lobby.current_question_count = 0
-        lobby.question_start_time = datetime.now()
+        lobby.question_start_time = get_current_time_ms()
         lobby.save()
 
         expected_lobby = lobby
@@ -404,66 +521,73 @@ class GameConsumerTestCase(TestCase):
         expected_lobby.users[self.user1.id]["hp"] -= settings.QUESTION_DIFFICULTY_DAMAGE_MAP[correct_answer_difficulty]
 
         question_max_duration = settings.QUESTION_MAX_DURATION_SECONDS_MAP[correct_answer_difficulty]
-        mock_datetime.now.return_value = expected_lobby.question_start_time + timedelta(
-            seconds=question_max_duration + 1
-        )
+        mock_get_current_time_ms.return_value = expected_lobby.question_start_time + (question_max_duration + 1) * 1000
 
         content: QuestionAnsweredEvent = {
             "type": "question.answered",
             "answer": expected_lobby.correct_answers[0].answer,
         }
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
 
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
         self.assertEqual(self.game_consumer.question_answered, True)
-        self.mock_send_event_to_lobby.assert_called_once_with(
-            "user.answered",
+        self.mock_send_json.assert_called_once_with(
             {
-                "user_id": self.user1.id,
+                "type": "question.result",
                 "correctly": False,
                 "correct_answer": expected_lobby.correct_answers[0].answer,
                 "damage": settings.QUESTION_DIFFICULTY_DAMAGE_MAP[correct_answer_difficulty],
+            }
+        )
+        self.game_consumer.channel_layer.send.assert_awaited_once_with(
+            "USER2_CHANNEL_NAME",
+            {
+                "type": "opponent.answered",
+                "correctly": False,
+                "damage": settings.QUESTION_DIFFICULTY_DAMAGE_MAP[correct_answer_difficulty],
             },
         )
 
     def test_receive_question_answered_second_time_and_user_hp_zero(self):
         self.game_consumer.user_id = self.user2.id
         self.game_consumer.determine_user_status_by_hp = MagicMock()
-        self.game_consumer.handle_game_end = MagicMock()
+        self.game_consumer.handle_game_end = AsyncMock()
 
         lobby = Lobby.get(self.lobby_name)
         lobby.correct_answers = self.correct_answers
         lobby.current_question_count = 0
         lobby.current_answer_count = 1
-        lobby.question_start_time = datetime.now()
+        lobby.question_start_time = get_current_time_ms()
         lobby.users[self.user1.id]["hp"] = 0
         lobby.save()
 
         expected_lobby = lobby
+        expected_lobby.current_answer_count = 2
+        expected_lobby.state = LobbyState.FINISHED
 
         content: QuestionAnsweredEvent = {
             "type": "question.answered",
             "answer": expected_lobby.correct_answers[0].answer,
         }
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
         self.assertEqual(self.game_consumer.question_answered, True)
-        self.game_consumer.determine_user_status_by_hp.assert_called_once_with(
-            [(user_id, data["hp"]) for user_id, data in lobby.users.items()]
+        self.game_consumer.determine_user_status_by_hp.assert_called_once_with(lobby.users)
+        self.game_consumer.handle_game_end.assert_called_once_with(
+            self.game_consumer.determine_user_status_by_hp(), bool(lobby.ranked)
         )
-        self.game_consumer.handle_game_end.assert_called_once_with(self.game_consumer.determine_user_status_by_hp())
 
-    @patch("trivia.consumers.datetime")
-    def test_receive_question_answered_second_time_and_game_duration_expired(self, mock_datetime):
+    @patch("trivia.consumers.get_current_time_ms")
+    def test_receive_question_answered_second_time_and_game_duration_expired(self, mock_get_current_time_ms):
         self.game_consumer.user_id = self.user2.id
         self.game_consumer.determine_user_status_by_hp = MagicMock()
-        self.game_consumer.handle_game_end = MagicMock()
+        self.game_consumer.handle_game_end = AsyncMock()
 
         lobby = Lobby.get(self.lobby_name)
         lobby.correct_answers = [
@@ -471,15 +595,17 @@ class GameConsumerTestCase(TestCase):
         ]
         lobby.current_question_count = 0
         lobby.current_answer_count = 1
-        lobby.game_start_time = datetime.now()
-        lobby.question_start_time = datetime.now()
+        lobby.game_start_time = get_current_time_ms()
+        lobby.question_start_time = get_current_time_ms()
         lobby.save()
 
         expected_lobby = lobby
+        expected_lobby.current_answer_count = 2
+        expected_lobby.state = LobbyState.FINISHED
 
-        mock_datetime.now.side_effect = [
+        mock_get_current_time_ms.side_effect = [
             expected_lobby.question_start_time,
-            expected_lobby.game_start_time + timedelta(seconds=settings.GAME_MAX_DURATION_SECONDS + 1),
+            expected_lobby.game_start_time + (settings.GAME_MAX_DURATION_SECONDS + 1) * 1000,
         ]
 
         content: QuestionAnsweredEvent = {
@@ -487,21 +613,21 @@ class GameConsumerTestCase(TestCase):
             "answer": expected_lobby.correct_answers[0].answer,
         }
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
         self.assertEqual(self.game_consumer.question_answered, True)
-        self.game_consumer.determine_user_status_by_hp.assert_called_once_with(
-            [(user_id, data["hp"]) for user_id, data in lobby.users.items()]
+        self.game_consumer.determine_user_status_by_hp.assert_called_once_with(lobby.users)
+        self.game_consumer.handle_game_end.assert_called_once_with(
+            self.game_consumer.determine_user_status_by_hp(), bool(lobby.ranked)
         )
-        self.game_consumer.handle_game_end.assert_called_once_with(self.game_consumer.determine_user_status_by_hp())
 
-    @patch("trivia.consumers.datetime")
-    def test_receive_question_answered_second_time_game_continues(self, mock_datetime):
+    @patch("trivia.consumers.get_current_time_ms")
+    def test_receive_question_answered_second_time_game_continues(self, mock_get_current_time_ms):
         self.game_consumer.user_id = self.user2.id
         self.game_consumer.determine_user_status_by_hp = MagicMock()
-        self.game_consumer.handle_game_end = MagicMock()
+        self.game_consumer.handle_game_end = AsyncMock()
 
         lobby = Lobby.get(self.lobby_name)
         lobby.correct_answers = [
@@ -509,8 +635,8 @@ class GameConsumerTestCase(TestCase):
         ]
         lobby.current_question_count = 0
         lobby.current_answer_count = 1
-        lobby.game_start_time = datetime.now()
-        lobby.question_start_time = datetime.now()
+        lobby.game_start_time = get_current_time_ms()
+        lobby.question_start_time = get_current_time_ms()
 
         lobby.save()
 
@@ -518,42 +644,67 @@ class GameConsumerTestCase(TestCase):
         expected_lobby.current_answer_count = 0
         expected_lobby.current_question_count += 1
 
-        mock_datetime.now.return_value = expected_lobby.question_start_time
+        mock_get_current_time_ms.return_value = expected_lobby.question_start_time
 
         content: QuestionAnsweredEvent = {
             "type": "question.answered",
             "answer": expected_lobby.correct_answers[0].answer,
         }
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
         self.assertEqual(self.game_consumer.question_answered, True)
         self.game_consumer.determine_user_status_by_hp.assert_not_called()
         self.game_consumer.handle_game_end.assert_not_called()
+        self.mock_prefetch_questions.assert_not_called()
+
+        self.mock_send_json.assert_called_once_with(
+            {
+                "type": "question.result",
+                "correctly": True,
+                "correct_answer": expected_lobby.correct_answers[0].answer,
+                "damage": 0,
+            }
+        )
+        self.game_consumer.channel_layer.send.assert_awaited_once_with(
+            "USER1_CHANNEL_NAME",
+            {"type": "opponent.answered", "correctly": True, "damage": 0},
+        )
+        self.mock_send_events_to_lobby.assert_called_once_with({"type": "question.next"})
+
+    @patch("trivia.consumers.get_current_time_ms")
+    def test_receive_question_answered_second_time_prefetches_next_questions(self, mock_get_current_time_ms):
+        self.game_consumer.user_id = self.user2.id
+
+        lobby = Lobby.get(self.lobby_name)
+        lobby.trivia_token = "FAKE_TOKEN"
+        lobby.correct_answers = self.correct_answers
+        lobby.current_question_count = QUESTION_PREFETCH_COUNT - 1
+        lobby.current_answer_count = 1
+        lobby.game_start_time = get_current_time_ms()
+        lobby.question_start_time = get_current_time_ms()
+        lobby.save()
+
+        mock_get_current_time_ms.return_value = lobby.question_start_time
+
+        content: QuestionAnsweredEvent = {
+            "type": "question.answered",
+            "answer": lobby.correct_answers[QUESTION_PREFETCH_COUNT - 1].answer,
+        }
+
+        async_to_sync(self.game_consumer.receive_json)(content)
+
+        self.assertEqual(Lobby.get(self.lobby_name).current_question_count, QUESTION_PREFETCH_COUNT)
+        self.mock_prefetch_questions.assert_called_once_with("FAKE_TOKEN")
+        self.mock_send_events_to_lobby.assert_called_once_with({"type": "question.next"})
 
-        self.mock_send_event_to_lobby.assert_has_calls(
-            (
-                call(
-                    "user.answered",
-                    {
-                        "user_id": self.user2.id,
-                        "correctly": True,
-                        "correct_answer": expected_lobby.correct_answers[0].answer,
-                        "damage": 0,
-                    },
-                ),
-                call("question.next"),
-            ),
-            any_order=False,
-        )
-
-    @patch("trivia.consumers.datetime")
-    def test_receive_question_answered_second_time_questions_exhausted(self, mock_datetime):
+    @patch("trivia.consumers.get_current_time_ms")
+    def test_receive_question_answered_second_time_questions_exhausted(self, mock_get_current_time_ms):
         self.game_consumer.user_id = self.user2.id
         self.game_consumer.determine_user_status_by_hp = MagicMock()
-        self.game_consumer.handle_game_end = MagicMock()
+        self.game_consumer.handle_game_end = AsyncMock()
         self.game_consumer.get_and_format_questions = MagicMock()
         self.game_consumer.get_and_format_questions.return_value = (self.formatted_questions, self.correct_answers)
 
@@ -561,22 +712,22 @@ class GameConsumerTestCase(TestCase):
         lobby.correct_answers = self.correct_answers
         lobby.current_question_count = settings.TRIVIA_API_QUESTION_AMOUNT - 1
         lobby.current_answer_count = 1
-        lobby.game_start_time = datetime.now()
-        lobby.question_start_time = datetime.now()
+        lobby.game_start_time = get_current_time_ms()
+        lobby.question_start_time = get_current_time_ms()
         lobby.save()
 
         expected_lobby = lobby
         expected_lobby.current_answer_count = 0
         expected_lobby.current_question_count = 0
 
-        mock_datetime.now.return_value = expected_lobby.question_start_time
+        mock_get_current_time_ms.return_value = expected_lobby.question_start_time
 
         content: QuestionAnsweredEvent = {
             "type": "question.answered",
             "answer": expected_lobby.correct_answers[settings.TRIVIA_API_QUESTION_AMOUNT - 1].answer,
         }
 
-        self.game_consumer.receive_json(content)
+        async_to_sync(self.game_consumer.receive_json)(content)
         lobby_after_call = Lobby.get(self.lobby_name)
 
         self.assertEqual(expected_lobby, lobby_after_call)
@@ -584,93 +735,142 @@ class GameConsumerTestCase(TestCase):
         self.game_consumer.determine_user_status_by_hp.assert_not_called()
         self.game_consumer.handle_game_end.assert_not_called()
         self.game_consumer.get_and_format_questions.assert_called_once_with(expected_lobby.trivia_token)
+        self.mock_prefetch_questions.assert_not_called()
 
-        self.mock_send_event_to_lobby.assert_has_calls(
-            (
-                call(
-                    "user.answered",
-                    {
-                        "user_id": self.user2.id,
-                        "correctly": True,
-                        "correct_answer": expected_lobby.correct_answers[
-                            settings.TRIVIA_API_QUESTION_AMOUNT - 1
-                        ].answer,
-                        "damage": 0,
-                    },
-                ),
-                call("question.data", {"questions": self.formatted_questions}),
-                call("question.next"),
-            ),
-            any_order=False,
+        self.mock_send_json.assert_called_once_with(
+            {
+                "type": "question.result",
+                "correctly": True,
+                "correct_answer": expected_lobby.correct_answers[settings.TRIVIA_API_QUESTION_AMOUNT - 1].answer,
+                "damage": 0,
+            }
+        )
+        self.game_consumer.channel_layer.send.assert_awaited_once_with(
+            "USER1_CHANNEL_NAME",
+            {"type": "opponent.answered", "correctly": True, "damage": 0},
+        )
+        self.mock_send_events_to_lobby.assert_called_once_with(
+            self.game_consumer.make_question_data_event(self.formatted_questions),
+            {"type": "question.next"},
         )
 
-    def test_receive_fifty_request_already_used(self):
-        self.game_consumer.fifty_used = True
+    @patch("trivia.consumers.get_current_time_ms")
+    def test_receive_question_answered_second_time_questions_exhausted_trivia_api_error(self, mock_get_current_time_ms):
+        self.game_consumer.user_id = self.user2.id
+        self.game_consumer.handle_game_end = AsyncMock()
+        self.game_consumer.get_and_format_questions = MagicMock()
+        self.game_consumer.get_and_format_questions.side_effect = TriviaAPIError("Trivia API responded with code 5")
 
-        content: FiftyRequestedEvent = {"type": "fifty.request", "answers": self.formatted_questions[0]["answers"]}
+        lobby = Lobby.get(self.lobby_name)
+        lobby.correct_answers = self.correct_answers
+        lobby.current_question_count = settings.TRIVIA_API_QUESTION_AMOUNT - 1
+        lobby.current_answer_count = 1
+        lobby.game_start_time = get_current_time_ms()
+        lobby.question_start_time = get_current_time_ms()
+        lobby.save()
 
-        self.game_consumer.receive_json(content)
+        expected_lobby = lobby
+        expected_lobby.current_answer_count = 2
+        expected_lobby.state = LobbyState.FINISHED
 
-        self.mock_send_json.assert_not_called()
+        mock_get_current_time_ms.return_value = expected_lobby.question_start_time
 
-    def test_receive_fifty_request_true_false_question(self):
-        self.game_consumer.token = self.user1_token
-        self.game_consumer.fifty_used = False
-        self.formatted_questions[0]["answers"] = ["True", "False"]
+        content: QuestionAnsweredEvent = {
+            "type": "question.answered",
+            "answer": expected_lobby.correct_answers[settings.TRIVIA_API_QUESTION_AMOUNT - 1].answer,
+        }
 
-        lobby = Lobby.get(self.lobby_name)
-        lobby.correct_answers = self.correct_answers
-        lobby.correct_answers[0] = CorrectAnswer("True", "easy")
-        lobby.current_question_count = 0
-        lobby.save()
+        async_to_sync(self.game_consumer.receive_json)(content)
+        lobby_after_call = Lobby.get(self.lobby_name)
 
-        content: FiftyRequestedEvent = {"type": "fifty.request", "answers": self.formatted_questions[0]["answers"]}
+        self.assertEqual(expected_lobby, lobby_after_call)
+        self.game_consumer.handle_game_end.assert_called_once_with(
+            {self.user1.id: GameStatus.DRAW, self.user2.id: GameStatus.DRAW}, True
+        )
+        self.mock_send_events_to_lobby.assert_not_called()
 
-        self.game_consumer.receive_json(content)
+    def test_get_next_questions_prefetched(self):
+        self.game_consumer.get_and_format_questions = MagicMock()
+        question_data_event = self.game_consumer.make_question_data_event(self.formatted_questions)
+        Lobby.store_next_questions(self.lobby_name, question_data_event["text_data"], self.correct_answers)
 
-        self.mock_send_json.assert_not_called()
+        next_questions = self.game_consumer.get_next_questions("FAKE_TOKEN")
 
-    @patch("trivia.consumers.random.sample")
-    def test_receive_fifty_request_multiple_choice_question(self, mock_sample):
-        self.game_consumer.user_id = self.user1.id
-        self.game_consumer.fifty_used = False
-        self.formatted_questions[0]["answers"] = ["1", "2", "3", "4"]
-        mock_sample.return_value = ["2", "4"]
+        self.assertEqual((question_data_event, self.correct_answers), next_questions)
+        self.assertIsNone(Lobby.pop_next_questions(self.lobby_name))
+        self.game_consumer.get_and_format_questions.assert_not_called()
+        self.mock_prefetch_questions.assert_not_called()
 
-        lobby = Lobby.get(self.lobby_name)
-        lobby.correct_answers = self.correct_answers
-        lobby.correct_answers[0] = CorrectAnswer("1", "easy")
-        lobby.current_question_count = 0
-        lobby.save()
+    def test_get_next_questions_not_prefetched(self):
+        self.game_consumer.get_and_format_questions = MagicMock()
+        self.game_consumer.get_and_format_questions.return_value = (self.formatted_questions, self.correct_answers)
 
-        content: FiftyRequestedEvent = {"type": "fifty.request", "answers": self.formatted_questions[0]["answers"]}
+        next_questions = self.game_consumer.get_next_questions("FAKE_TOKEN")
 
-        self.game_consumer.receive_json(content)
-        self.mock_send_json.assert_called_once_with(
-            {"type": "fifty.response", "incorrect_answers": mock_sample.return_value}
+        self.assertEqual(
+            (self.game_consumer.make_question_data_event(self.formatted_questions), self.correct_answers),
+            next_questions,
         )
+        self.game_consumer.get_and_format_questions.assert_called_once_with("FAKE_TOKEN")
+        self.mock_prefetch_questions.assert_not_called()
 
-    def test_receive_fifty_request_with_incorrect_amount_of_answers(self):
-        self.game_consumer.user_id = self.user1.id
-        self.game_consumer.fifty_used = False
-        self.formatted_questions[0]["answers"] = ["1", "2", "3", "4", "5"]
+    def test_store_next_questions(self):
+        self.mock_get_questions.return_value = self.questions
+
+        self.game_consumer.store_next_questions(self.lobby_name, "FAKE_TOKEN")
+
+        self.mock_get_questions.assert_called_with("FAKE_TOKEN")
+        next_question_data, next_correct_answers = Lobby.pop_next_questions(self.lobby_name)
+        next_question_data = json.loads(next_question_data)
+        self.assertEqual(next_question_data["type"], "question.data")
+        self.assertEqual(len(self.formatted_questions), len(next_question_data["questions"]))
+        self.assertEqual(self.correct_answers, next_correct_answers)
+
+    def test_store_next_questions_without_questions(self):
+        self.mock_get_questions.return_value = []
+
+        self.game_consumer.store_next_questions(self.lobby_name, "FAKE_TOKEN")
+
+        self.assertIsNone(Lobby.pop_next_questions(self.lobby_name))
+
+    def test_store_next_questions_api_error(self):
+        self.mock_get_questions.side_effect = TriviaAPIError("Trivia API responded with code 5")
+
+        with self.assertRaises(TriviaAPIError):
+            self.game_consumer.store_next_questions(self.lobby_name, "FAKE_TOKEN")
+
+        self.assertIsNone(Lobby.pop_next_questions(self.lobby_name))
+
+    def test_receive_fifty_request_invalid_answers(self):
+        cases = (
+            ("true/false question", ["True", "False", "1", "2"], CorrectAnswer("True", "easy")),
+            ("incorrect amount of answers", ["1", "2", "3", "4", "5"], CorrectAnswer("1", "easy")),
+            ("repeated answers", ["1", "1", "2", "3"], CorrectAnswer("1", "easy")),
+        )
 
         lobby = Lobby.get(self.lobby_name)
         lobby.correct_answers = self.correct_answers
-        lobby.correct_answers[0] = CorrectAnswer("1", "easy")
         lobby.current_question_count = 0
-        lobby.save()
 
-        content: FiftyRequestedEvent = {"type": "fifty.request", "answers": self.formatted_questions[0]["answers"]}
+        for case, answers, correct_answer in cases:
+            with self.subTest(case):
+                self.game_consumer.fifty_used = False
+                lobby.correct_answers[0] = correct_answer
+                lobby.save()
 
-        self.game_consumer.receive_json(content)
-        self.mock_send_json.assert_not_called()
+                content: FiftyRequestedEvent = {"type": "fifty.request", "answers": answers}
+
+                async_to_sync(self.game_consumer.receive_json)(content)
 
-    def test_receive_fifty_request_with_repeated_answers(self):
+                self.assertTrue(self.game_consumer.fifty_used)
+                self.mock_send_json.assert_not_called()
+
+    @patch("trivia.consumers.random.sample")
+    def test_receive_fifty_request_multiple_choice_question(self, mock_sample):
         self.game_consumer.user_id = self.user1.id
-        self.game_consumer.token = self.user1_token
         self.game_consumer.fifty_used = False
-        self.formatted_questions[0]["answers"] = ["1", "1", "2", "3"]
+        self.formatted_questions[0]["answers"] = ["1", "2", "3", "4"]
+        mock_sample.return_value = ["2", "4"]
 
         lobby = Lobby.get(self.lobby_name)
         lobby.correct_answers = self.correct_answers
@@ -680,56 +880,36 @@ class GameConsumerTestCase(TestCase):
 
         content: FiftyRequestedEvent = {"type": "fifty.request", "answers": self.formatted_questions[0]["answers"]}
 
-        self.game_consumer.receive_json(content)
-        self.mock_send_json.assert_not_called()
-
-    @patch("trivia.consumers.async_to_sync")
-    def test_send_event_to_lobby(self, mock_async_to_sync: MagicMock):
-        mock_async_to_sync.side_effect = lambda func: func
-        msg_type = "MESSAGE.TYPE"
-        data = {"SOME_DATA_KEY": "SOME_DATA_VALUE"}
-
-        self.send_event_to_lobby_patcher.stop()
-        self.game_consumer.send_event_to_lobby(msg_type, data)
-        self.send_event_to_lobby_patcher.start()
+        async_to_sync(self.game_consumer.receive_json)(content)
+        self.mock_send_json.assert_called_once_with(
+            {"type": "fifty.response", "incorrect_answers": mock_sample.return_value}
+        )
 
-        mock_async_to_sync.assert_called_once_with(self.game_consumer.channel_layer.group_send)
-        self.game_consumer.channel_layer.group_send.assert_called_once_with(self.lobby_name, {"type": msg_type, **data})
+    @patch("trivia.consumers.Lobby.get_current_correct_answer")
+    def test_receive_fifty_request_lobby_does_not_exist(self, mock_get_current_correct_answer):
+        self.game_consumer.fifty_used = False
+        mock_get_current_correct_answer.return_value = None
 
-    @patch("trivia.consumers.async_to_sync")
-    def test_send_event_to_lobby_without_data(self, mock_async_to_sync: MagicMock):
-        mock_async_to_sync.side_effect = lambda func: func
-        msg_type = "MESSAGE.TYPE"
+        content: FiftyRequestedEvent = {"type": "fifty.request", "answers": ["1", "2", "3", "4"]}
 
-        self.send_event_to_lobby_patcher.stop()
-        self.game_consumer.send_event_to_lobby(msg_type)
-        self.send_event_to_lobby_patcher.start()
+        async_to_sync(self.game_consumer.receive_json)(content)
 
-        mock_async_to_sync.assert_called_once_with(self.game_consumer.channel_layer.group_send)
-        self.game_consumer.channel_layer.group_send.assert_called_once_with(self.lobby_name, {"type": msg_type})
+        mock_get_current_correct_answer.assert_called_once_with(self.lobby_name)
+        self.mock_send_json.assert_not_called()
 
     def test_handle_game_end_normal(self):
-        lobby = Lobby.get(self.lobby_name)
-        lobby.ranked = False
-        lobby.save()
-
-        expected_lobby = lobby
-        expected_lobby.state = LobbyState.FINISHED
-
         users = {
             self.user1.id: GameStatus.WIN,
             self.user2.id: GameStatus.LOSS,
         }
 
-        self.game_consumer.handle_game_end(users)
+        async_to_sync(self.game_consumer.handle_game_end)(users, False)
 
         self.user1.refresh_from_db()
         self.user2.refresh_from_db()
         games = Game.objects.all()
         user_games = UserGame.objects.all()
-        lobby_after_call = Lobby.get(self.lobby_name)
 
-        self.assertEqual(expected_lobby, lobby_after_call)
         self.assertEqual(len(games), 1)
         self.assertEqual(len(user_games), 2)
         self.assertEqual(list(self.user1.games.all()), list(self.user2.games.all()))
@@ -746,9 +926,6 @@ class GameConsumerTestCase(TestCase):
         )
 
     def test_handle_game_end_ranked(self):
-        expected_lobby = Lobby.get(self.lobby_name)
-        expected_lobby.state = LobbyState.FINISHED
-
         user1_before_rank = self.user1.rank
         user2_before_rank = self.user2.rank
 
@@ -757,15 +934,13 @@ class GameConsumerTestCase(TestCase):
             self.user2.id: GameStatus.LOSS,
         }
 
-        self.game_consumer.handle_game_end(users)
+        async_to_sync(self.game_consumer.handle_game_end)(users, True)
 
         self.user1.refresh_from_db()
         self.user2.refresh_from_db()
         games = Game.objects.all()
         user_games = UserGame.objects.all()
-        lobby_after_call = Lobby.get(self.lobby_name)
 
-        self.assertEqual(expected_lobby, lobby_after_call)
         self.assertEqual(len(games), 1)
         self.assertEqual(len(user_games), 2)
         self.assertEqual(list(self.user1.games.all()), list(self.user2.games.all()))
@@ -783,12 +958,38 @@ class GameConsumerTestCase(TestCase):
             },
         )
 
-    def test_game_prepare(self):
-        event = {"type": "game.prepare"}
+    def test_handle_game_end_notifies_users_before_storing_the_game(self):
+        users = {
+            self.user1.id: GameStatus.WIN,
+            self.user2.id: GameStatus.LOSS,
+        }
 
-        self.game_consumer.game_prepare(event)
+        async def assert_game_not_stored(*args):
+            self.assertFalse(await database_sync_to_async(Game.objects.exists)())
 
-        self.mock_send_json.assert_called_once_with(event)
+        self.mock_send_event_to_lobby.side_effect = assert_game_not_stored
+
+        async_to_sync(self.game_consumer.handle_game_end)(users, True)
+
+        self.mock_send_event_to_lobby.assert_called_once_with("game.end", ANY)
+        self.assertTrue(Game.objects.exists())
+
+    def test_handle_game_end_ranked_rank_does_not_go_below_zero(self):
+        self.user2.rank = settings.GAME_RANK_GAIN // 2
+        self.user2.save()
+
+        users = {
+            self.user1.id: GameStatus.WIN,
+            self.user2.id: GameStatus.LOSS,
+        }
+
+        async_to_sync(self.game_consumer.handle_game_end)(users, True)
+
+        self.user2.refresh_from_db()
+        user2_game = UserGame.objects.get(user=self.user2)
+
+        self.assertEqual(self.user2.rank, 0)
+        self.assertEqual(user2_game.rank, 0)
 
     def test_game_start(self):
         event = {
@@ -798,14 +999,14 @@ class GameConsumerTestCase(TestCase):
         }
         self.game_consumer.user_id = self.user1.id
 
-        self.game_consumer.game_start(event)
+        async_to_sync(self.game_consumer.game_start)(event)
 
         self.mock_send_json.assert_called_once_with(
             {"type": event["type"], "duration": event["duration"], "opponent": event["users"][str(self.user1.id)]}
         )
 
     @patch("trivia.consumers.GameConsumer.close")
-    def test_game_end(self, mock_close: MagicMock):
+    def test_game_end(self, mock_close: AsyncMock):
         event: GameEndEvent = {
             "type": "game.end",
             "users": {
@@ -815,7 +1016,7 @@ class GameConsumerTestCase(TestCase):
         }
         self.game_consumer.user_id = self.user1.id
 
-        self.game_consumer.game_end(event)
+        async_to_sync(self.game_consumer.game_end)(event)
 
         self.mock_send_json.assert_called_once_with(
             {
@@ -826,113 +1027,217 @@ class GameConsumerTestCase(TestCase):
         )
         mock_close.assert_called_once()
 
-    def test_question_data(self):
-        event = {
-            "type": "question.data",
-            "questions": ANY,
-        }
+    def test_make_question_data_event(self):
+        event = self.game_consumer.make_question_data_event(self.formatted_questions)
 
-        self.game_consumer.question_data(event)
+        self.assertEqual(event["type"], "question.data")
+        self.assertEqual(
+            json.loads(event["text_data"]),
+            {"type": "question.data", "questions": self.formatted_questions},
+        )
 
-        self.mock_send_json.assert_called_once_with(event)
 
-    def test_question_next(self):
-        event = {"type": "question.next"}
+class GameConsumerHandlerTestCase(SimpleTestCase):
+    """Tests of GameConsumer methods that use neither the database nor redis"""
 
-        self.game_consumer.question_next(event)
+    lobby_name = "TEST_LOBBY_NAME"
+    user1_id = 1
+    user2_id = 2
 
-        self.assertFalse(self.game_consumer.question_answered)
-        self.mock_send_json.assert_called_once_with(event)
+    def setUp(self):
+        self.send_json_patcher = patch("trivia.consumers.GameConsumer.send_json")
+        self.mock_send_json = self.send_json_patcher.start()
 
-    def test_user_answered_self(self):
-        event = {
-            "type": "user.answered",
-            "user_id": self.user1.id,
-            "correctly": True,
-            "correct_answer": "CORRECT_ANSWER",
-            "damage": 20,
-        }
-        self.game_consumer.user_id = self.user1.id
+        self.game_consumer = GameConsumer()
+        self.game_consumer.lobby_name = self.lobby_name
+        self.game_consumer.channel_layer = AsyncMock()
+        self.game_consumer.channel_name = "TEST_CHANNEL_NAME"
+
+    def tearDown(self):
+        self.send_json_patcher.stop()
 
-        self.game_consumer.user_answered(event)
+    def test_receive_fifty_request_without_answers(self):
+        content: ClientEvent = {"type": "fifty.request", "answers": "NOT_A_LIST"}
 
-        self.mock_send_json.assert_called_once_with(
-            {
-                "type": "question.result",
-                "correctly": event["correctly"],
-                "correct_answer": event["correct_answer"],
-                "damage": 20,
-            }
+        async_to_sync(self.game_consumer.receive_json)(content)
+
+        self.assertFalse(self.game_consumer.fifty_used)
+        self.mock_send_json.assert_not_called()
+
+    def test_receive_fifty_request_already_used(self):
+        self.game_consumer.fifty_used = True
+
+        content: FiftyRequestedEvent = {"type": "fifty.request", "answers": ["1", "2", "3", "4"]}
+
+        async_to_sync(self.game_consumer.receive_json)(content)
+
+        self.mock_send_json.assert_not_called()
+
+    @patch("trivia.consumers.question_prefetch_executor")
+    def test_prefetch_questions(self, mock_executor: MagicMock):
+        self.game_consumer.prefetch_questions("FAKE_TOKEN")
+
+        mock_executor.submit.assert_called_once_with(
+            self.game_consumer.store_next_questions, self.lobby_name, "FAKE_TOKEN"
+        )
+        mock_executor.submit.return_value.add_done_callback.assert_called_once_with(log_prefetch_error)
+
+    def test_log_prefetch_error(self):
+        future = Future()
+        future.set_exception(TriviaAPIError("Trivia API responded with code 5"))
+
+        with self.assertLogs("trivia.consumers", level="ERROR"):
+            log_prefetch_error(future)
+
+    def test_log_prefetch_error_without_exception(self):
+        future = Future()
+        future.set_result(None)
+
+        with self.assertNoLogs("trivia.consumers"):
+            log_prefetch_error(future)
+
+    def test_send_event_to_lobby(self):
+        msg_type = "MESSAGE.TYPE"
+        data = {"SOME_DATA_KEY": "SOME_DATA_VALUE"}
+
+        async_to_sync(self.game_consumer.send_event_to_lobby)(msg_type, data)
+
+        self.game_consumer.channel_layer.group_send.assert_awaited_once_with(
+            self.lobby_name, {"type": msg_type, **data}
         )
 
-    def test_user_answered_opponent(self):
+    def test_send_event_to_lobby_without_data(self):
+        msg_type = "MESSAGE.TYPE"
+
+        async_to_sync(self.game_consumer.send_event_to_lobby)(msg_type)
+
+        self.game_consumer.channel_layer.group_send.assert_awaited_once_with(self.lobby_name, {"type": msg_type})
+
+    def test_send_events_to_lobby(self):
+        events = ({"type": "FIRST.TYPE"}, {"type": "SECOND.TYPE", "SOME_DATA_KEY": "SOME_DATA_VALUE"})
+
+        async_to_sync(self.game_consumer.send_events_to_lobby)(*events)
+
+        self.game_consumer.channel_layer.group_send.assert_awaited_once_with(
+            self.lobby_name, {"type": "lobby.events", "events": list(events)}
+        )
+
+    @patch("trivia.consumers.GameConsumer.dispatch")
+    def test_lobby_events(self, mock_dispatch: AsyncMock):
+        events = [{"type": "question.data", "text_data": "SOME_TEXT_DATA"}, {"type": "question.next"}]
+
+        async_to_sync(self.game_consumer.lobby_events)({"type": "lobby.events", "events": events})
+
+        mock_dispatch.assert_has_awaits([call(event) for event in events])
+        self.assertEqual(mock_dispatch.await_count, len(events))
+
+    @patch("trivia.consumers.GameConsumer.send")
+    def test_game_prepare(self, mock_send: AsyncMock):
+        event = {"type": "game.prepare"}
+
+        async_to_sync(self.game_consumer.game_prepare)(event)
+
+        mock_send.assert_called_once_with(text_data=ANY)
+        self.assertEqual(json.loads(mock_send.call_args.kwargs["text_data"]), event)
+
+    @patch("trivia.consumers.GameConsumer.send")
+    def test_question_data(self, mock_send: AsyncMock):
         event = {
-            "type": "user.answered",
-            "user_id": self.user1.id,
-            "correctly": True,
-            "correct_answer": "CORRECT_ANSWER",
-            "damage": 20,
+            "type": "question.data",
+            "text_data": "TEXT_DATA",
         }
-        self.game_consumer.user_id = self.user2.id
 
-        self.game_consumer.user_answered(event)
+        async_to_sync(self.game_consumer.question_data)(event)
 
-        self.mock_send_json.assert_called_once_with(
-            {"type": "opponent.answered", "correctly": event["correctly"], "damage": 20}
-        )
+        mock_send.assert_called_once_with(text_data=event["text_data"])
+
+    def test_encode_json(self):
+        content = {"type": "fifty.response", "incorrect_answers": ["1", "2"]}
+
+        text_data = async_to_sync(GameConsumer.encode_json)(content)
+
+        self.assertIsInstance(text_data, str)
+        self.assertEqual(json.loads(text_data), content)
+
+    def test_decode_json(self):
+        content = {"type": "question.answered", "answer": "ANSWER"}
+
+        self.assertEqual(async_to_sync(GameConsumer.decode_json)(json.dumps(content)), content)
+
+    @patch("trivia.consumers.GameConsumer.send")
+    def test_question_next(self, mock_send: AsyncMock):
+        event = {"type": "question.next"}
+
+        async_to_sync(self.game_consumer.question_next)(event)
+
+        self.assertFalse(self.game_consumer.question_answered)
+        mock_send.assert_called_once_with(text_data=ANY)
+        self.assertEqual(json.loads(mock_send.call_args.kwargs["text_data"]), event)
+
+    def test_opponent_answered(self):
+        event = {"type": "opponent.answered", "correctly": True, "damage": 20}
+
+        async_to_sync(self.game_consumer.opponent_answered)(event)
+
+        self.mock_send_json.assert_called_once_with(event)
 
     def test_determine_user_status_by_hp_equal(self):
-        data = [
-            (self.user1.id, 100),
-            (self.user2.id, 100),
-        ]
+        data = {
+            self.user1_id: {"name": "user1", "hp": 100},
+            self.user2_id: {"name": "user2", "hp": 100},
+        }
 
         status_dict = self.game_consumer.determine_user_status_by_hp(data)
 
         self.assertEqual(
             status_dict,
             {
-                self.user1.id: GameStatus.DRAW,
-                self.user2.id: GameStatus.DRAW,
+                self.user1_id: GameStatus.DRAW,
+                self.user2_id: GameStatus.DRAW,
             },
         )
 
     def test_determine_user_status_by_hp_user1_more(self):
-        data = [
-            (self.user1.id, 100),
-            (self.user2.id, 50),
-        ]
+        data = {
+            self.user1_id: {"name": "user1", "hp": 100},
+            self.user2_id: {"name": "user2", "hp": 50},
+        }
 
         status_dict = self.game_consumer.determine_user_status_by_hp(data)
 
         self.assertEqual(
             status_dict,
             {
-                self.user1.id: GameStatus.WIN,
-                self.user2.id: GameStatus.LOSS,
+                self.user1_id: GameStatus.WIN,
+                self.user2_id: GameStatus.LOSS,
             },
         )
 
     def test_determine_user_status_by_hp_user1_less(self):
-        data = [
-            (self.user1.id, 50),
-            (self.user2.id, 100),
-        ]
+        data = {
+            self.user1_id: {"name": "user1", "hp": 50},
+            self.user2_id: {"name": "user2", "hp": 100},
+        }
 
         status_dict = self.game_consumer.determine_user_status_by_hp(data)
 
         self.assertEqual(
             status_dict,
             {
-                self.user1.id: GameStatus.LOSS,
-                self.user2.id: GameStatus.WIN,
+                self.user1_id: GameStatus.LOSS,
+                self.user2_id: GameStatus.WIN,
             },
         )
 
-    @patch("trivia.consumers.random.sample")
-    def test_format_trivia_question_decodes_and_formats_correctly(self, mock_sample):
-        mock_sample.side_effect = lambda answers, k: list(answers)
+    def test_determine_rank_gain_by_game_status(self):
+        self.assertEqual(self.game_consumer.determine_rank_gain_by_game_status(GameStatus.WIN), settings.GAME_RANK_GAIN)
+        self.assertEqual(
+            self.game_consumer.determine_rank_gain_by_game_status(GameStatus.LOSS), -settings.GAME_RANK_GAIN
+        )
+        self.assertEqual(self.game_consumer.determine_rank_gain_by_game_status(GameStatus.DRAW), 0)
 
+    @patch("trivia.consumers.random.shuffle")
+    def test_format_trivia_question_decodes_and_formats_correctly(self, mock_shuffle: MagicMock):
         question = "<FAKE QUESTION>"
         correct_answer = "<&FAKE_CORRECT_ANSWER&>"
         incorrect_answers = [
@@ -965,6 +1270,7 @@ class GameConsumerTestCase(TestCase):
             },
         )
         self.assertEqual(correct_answer, correct_answer_result)
+        mock_shuffle.assert_called_once_with(formatted_question["answers"])
 
     def test_format_trivia_question_boolean_type(self):
         question = "<FAKE QUESTION>"
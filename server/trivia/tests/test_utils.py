@@ -1,31 +1,39 @@
-import json
 from unittest.mock import patch
 
 from django.conf import settings
-from django.test import TestCase
-from trivia.utils import TriviaAPIClient
-
-FIXTURES_PATH = settings.BASE_DIR / "fixtures"
-
-
-class TriviaAPIClientTestCase(TestCase):
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from trivia.tests import load_questions_fixture
+from trivia.utils import (
+    LOBBY_TOKEN_LIFETIME_SECONDS,
+    InvalidLobbyTokenError,
+    TriviaAPIClient,
+    TriviaAPIError,
+    decode_lobby_token,
+    generate_lobby_token,
+)
+
+User = get_user_model()
+
+
+class TriviaAPIClientTestCase(SimpleTestCase):
     @classmethod
-    def setUpTestData(cls):
-        with open(FIXTURES_PATH / "questions.json") as file:
-            cls.questions = json.load(file)
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.questions = load_questions_fixture()
 
     def setUp(self) -> None:
         self.requests_patcher = patch("trivia.utils.requests")
         self.mock_requests = self.requests_patcher.start()
 
     def tearDown(self) -> None:
-        self.mock_requests.stop()
+        self.requests_patcher.stop()
 
     def test_get_questions_without_token(self):
         url = settings.TRIVIA_API_URL
 
         mock_response = self.mock_requests.get.return_value
-        mock_response.json.return_value = {"results": self.questions}
+        mock_response.json.return_value = {"response_code": 0, "results": self.questions}
 
         questions = TriviaAPIClient.get_questions()
 
@@ -37,13 +45,20 @@ class TriviaAPIClientTestCase(TestCase):
         url = settings.TRIVIA_API_URL + f"&token={token}"
 
         mock_response = self.mock_requests.get.return_value
-        mock_response.json.return_value = {"results": self.questions}
+        mock_response.json.return_value = {"response_code": 0, "results": self.questions}
 
         questions = TriviaAPIClient.get_questions(token)
 
         self.mock_requests.get.assert_called_once_with(url)
         self.assertEqual(questions, self.questions)
 
+    def test_get_questions_without_results(self):
+        mock_response = self.mock_requests.get.return_value
+        mock_response.json.return_value = {"response_code": 4, "results": []}
+
+        with self.assertRaises(TriviaAPIError):
+            TriviaAPIClient.get_questions("RANDOM_TOKEN")
+
     def test_get_token(self):
         token = "RANDOM_TOKEN"
 
@@ -54,3 +69,35 @@ class TriviaAPIClientTestCase(TestCase):
 
         self.mock_requests.get.assert_called_once_with(settings.TRIVIA_API_TOKEN_URL)
         self.assertEqual(received_token, token)
+
+
+class LobbyTokenTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.user = User(id=1, username="user1")
+        self.lobby_name = "TEST_LOBBY_NAME"
+
+    def test_decode_lobby_token(self):
+        token = generate_lobby_token(self.user, self.lobby_name)
+
+        self.assertEqual(
+            decode_lobby_token(token),
+            {"id": self.user.id, "username": self.user.username, "lobby_name": self.lobby_name},
+        )
+
+    def test_decode_lobby_token_invalid_signature(self):
+        token = generate_lobby_token(self.user, self.lobby_name)
+        other_token = generate_lobby_token(self.user, "SOME_OTHER_LOBBY")
+        tampered_token = other_token.rpartition(":")[0] + ":" + token.rpartition(":")[2]
+
+        for invalid_token in (tampered_token, token + "a", "", "not.a.token"):
+            with self.assertRaises(InvalidLobbyTokenError):
+                decode_lobby_token(invalid_token)
+
+    @patch("django.core.signing.time.time")
+    def test_decode_lobby_token_expired(self, mock_time):
+        mock_time.return_value = 1_000_000
+        token = generate_lobby_token(self.user, self.lobby_name)
+
+        mock_time.return_value += LOBBY_TOKEN_LIFETIME_SECONDS + 1
+        with self.assertRaises(InvalidLobbyTokenError):
+            decode_lobby_token(token)
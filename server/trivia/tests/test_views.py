@@ -1,20 +1,18 @@
-import json
 from unittest.mock import patch
 
-from core.settings.base import BASE_DIR
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from redis_om import get_redis_connection
 from rest_framework import status
 from rest_framework.test import APITestCase
 from trivia.models import Game, Lobby
+from trivia.tests import load_questions_fixture
 from trivia.types import GameStatus, GameType
-
-FIXTURES_PATH = BASE_DIR / "fixtures"
+from trivia.utils import TriviaAPIError
 
 User = get_user_model()
-redis = get_redis_connection()
+# the tests share the connection pool of the lobby model, instead of opening their own connections
+redis = Lobby.db()
 
 
 class LobbyViewSetTestCase(APITestCase):
@@ -30,8 +28,10 @@ class LobbyViewSetTestCase(APITestCase):
         self.lobby.save()
 
     def tearDown(self):
-        for key in redis.scan_iter("*"):
-            redis.delete(key)
+        # keys are removed with a single command, flushing the database would also drop the lobby search index
+        keys = redis.keys()
+        if keys:
+            redis.unlink(*keys)
 
     def test_create_lobby(self):
         url = reverse("lobby-list")
@@ -49,6 +49,17 @@ class LobbyViewSetTestCase(APITestCase):
         self.assertEqual(lobby.name, lobby_name)
         self.assertIsNotNone(response.data.get("token"))
 
+    def test_create_lobby_drops_stale_next_questions(self):
+        url = reverse("lobby-list")
+        lobby_name = "TEST_CREATE_LOBBY"
+        Lobby.store_next_questions(lobby_name, "STALE_QUESTION_DATA", [])
+
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.post(url, {"name": lobby_name}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(Lobby.pop_next_questions(lobby_name))
+
     def test_create_lobby_already_created(self):
         url = reverse("lobby-list")
         lobby_name = "TEST_CREATE_LOBBY"
@@ -177,8 +188,7 @@ class TrainingViewTestCase(APITestCase):
     def setUpTestData(cls):
         cls.user1, cls.user2 = User.objects.all()[:2]
 
-        with open(FIXTURES_PATH / "questions.json") as file:
-            cls.questions = json.load(file)
+        cls.questions = load_questions_fixture()
 
     @patch("trivia.consumers.TriviaAPIClient.get_questions")
     def test_get_training_questions(self, mock_get_questions):
@@ -192,6 +202,17 @@ class TrainingViewTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, self.questions)
 
+    @patch("trivia.consumers.TriviaAPIClient.get_questions")
+    def test_get_training_questions_trivia_api_error(self, mock_get_questions):
+        mock_get_questions.side_effect = TriviaAPIError("Trivia API responded with code 5")
+
+        url = reverse("train")
+
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
     def test_post_training_result(self):
         url = reverse("train")
 
@@ -109,20 +109,18 @@ class GameEndEvent(ServerEvent):
 
 
 class QuestionDataEvent(ServerEvent):
-    questions: list[FormattedQuestion]
+    """
+    Carries a new set of questions for the users. The message sent to the users
+    is encoded once by the sender, instead of separately for every user.
+    """
+
+    text_data: str
 
 
 class QuestionNextEvent(ServerEvent):
     pass
 
 
-class UserAnsweredEvent(ServerEvent):
-    user_id: UserId
-    correctly: bool
-    correct_answer: str
-    damage: int
-
-
 class QuestionResultEvent(ServerEvent):
     correctly: bool
     correct_answer: str
@@ -134,6 +132,15 @@ class OpponentAnsweredEvent(ServerEvent):
     damage: int
 
 
+class LobbyEventsEvent(ServerEvent):
+    """
+    Carries several events that are broadcast to a lobby with a single channel layer message.
+    The events are handled by the receiving consumers in order.
+    """
+
+    events: list[ServerEvent]
+
+
 class QuestionAnsweredEvent(ClientEvent):
     answer: str
 
@@ -1,13 +1,24 @@
-from datetime import datetime, timedelta, timezone
+import time
 
-import jwt
 import requests
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core import signing
 from trivia.types import TriviaAPIQuestion
 
 User = get_user_model()
 
+LOBBY_TOKEN_LIFETIME_SECONDS = 5
+LOBBY_TOKEN_SALT = "trivia.lobby_token"
+
+
+class InvalidLobbyTokenError(Exception):
+    pass
+
+
+class TriviaAPIError(Exception):
+    pass
+
 
 class TriviaAPIClient:
     """Client used to communicated with the Trivia Questions API"""
@@ -23,13 +34,21 @@ class TriviaAPIClient:
 
         Returns:
             A list of trivia questions
+
+        Raises:
+            TriviaAPIError: if the API did not return any questions, e.g. because the token is exhausted
+                            or requests are being rate limited
         """
         url = settings.TRIVIA_API_URL + (f"&token={token}" if token else "")
 
         response = requests.get(url)
         response.raise_for_status()
 
-        return response.json()["results"]
+        data = response.json()
+        if data["response_code"] != 0:
+            raise TriviaAPIError(f"Trivia API responded with code {data['response_code']}")
+
+        return data["results"]
 
     @staticmethod
     def get_token() -> str:
@@ -67,12 +86,18 @@ def parse_boolean_string(value: str) -> bool:
     return true_false_bool[true_false_str.index(value.lower())]
 
 
+def get_current_time_ms() -> int:
+    """Returns the current time as milliseconds since the epoch"""
+    return time.time_ns() // 1_000_000
+
+
 def generate_lobby_token(user: User, lobby_name: str) -> str:
     """
     Generate a lobby authentication token.
 
-    The token is a JWT intended to be used by users to connect to the
-    GameConsumer websocket consumer.
+    The token is intended to be used by users to connect to the
+    GameConsumer websocket consumer. It is a timestamped token signed
+    with django's signing module.
 
     The token has a very short lifetime and is intended to be used immediately
     after being obtained.
@@ -82,23 +107,25 @@ def generate_lobby_token(user: User, lobby_name: str) -> str:
         lobby_name: name of the lobby for which the token is generated for
 
     Returns:
-        base64 encoded JWT
-
+        signed lobby token
     """
+    return signing.dumps({"id": user.id, "username": user.username, "lobby_name": lobby_name}, salt=LOBBY_TOKEN_SALT)
 
-    token = jwt.encode(
-        {
-            "id": user.id,
-            "username": user.username,
-            "lobby_name": lobby_name,
-            "exp": datetime.now(tz=timezone.utc) + timedelta(seconds=5),
-        },
-        settings.SECRET_KEY,
-        algorithm="HS256",
-    )
 
-    return token
+def decode_lobby_token(token: str) -> dict:
+    """
+    Verify a lobby authentication token and return its data.
 
+    Args:
+        token: token generated by generate_lobby_token
 
-def decode_lobby_token(token: str) -> dict:
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    Returns:
+        dictionary with the id, username and lobby_name of the token
+
+    Raises:
+        InvalidLobbyTokenError: if the token is malformed, has an invalid signature or has expired
+    """
+    try:
+        return signing.loads(token, salt=LOBBY_TOKEN_SALT, max_age=LOBBY_TOKEN_LIFETIME_SECONDS)
+    except signing.BadSignature as e:
+        raise InvalidLobbyTokenError(str(e))
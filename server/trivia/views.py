@@ -11,7 +11,12 @@ from rest_framework.viewsets import ViewSet
 from .models import Game, Lobby, UserGame
 from .serializers import LobbySerializer, UserGameSerializer
 from .types import GameStatus, GameType
-from .utils import TriviaAPIClient, generate_lobby_token, parse_boolean_string
+from .utils import (
+    TriviaAPIClient,
+    TriviaAPIError,
+    generate_lobby_token,
+    parse_boolean_string,
+)
 
 
 class LobbyViewSet(ViewSet):
@@ -32,11 +37,16 @@ class LobbyViewSet(ViewSet):
         serializer.is_valid(raise_exception=True)
 
         lobby = serializer.Meta.model(**serializer.validated_data)
-        lobby.save()
 
-        token = generate_lobby_token(request.user, lobby.name)
+        # the lobby and its expiration time are stored with a single round trip to redis
+        pipeline = lobby.db().pipeline()
+        lobby.save(pipeline=pipeline)
+        pipeline.expire(lobby.key(), settings.LOBBY_EXPIRE_SECONDS)
+        # questions that a prefetch of an earlier lobby with the same name stored after it was deleted are dropped
+        pipeline.delete(Lobby.make_next_questions_key(lobby.name))
+        pipeline.execute()
 
-        lobby.db().expire(lobby.key(), settings.LOBBY_EXPIRE_SECONDS)
+        token = generate_lobby_token(request.user, lobby.name)
 
         return Response(data={"token": token}, status=status.HTTP_201_CREATED)
 
@@ -96,7 +106,13 @@ class TrainingView(APIView):
     def get(self, request):
         """Gives questions to the client for training"""
 
-        questions = TriviaAPIClient.get_questions()
+        try:
+            questions = TriviaAPIClient.get_questions()
+        except TriviaAPIError:
+            return Response(
+                data={"detail": "Could not obtain questions, try again later"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
 
         return Response(data=questions)
 